@@ -1,6 +1,4 @@
-from crewai import Agent
-from tools.web_tools import get_search_results_tool, scrape_search_results_tool
-
+# crewai (and the web tools) are imported inside make_agent, so importing this module stays cheap.
 
 
 class WritingStyleDecisionAgent:
@@ -33,6 +31,8 @@ class WritingStyleDecisionAgent:
         Returns:
             Agent: An instance of the Agent class configured to select appropriate writing styles based on topic.
         """
+        from crewai import Agent
+
         return Agent(
             role="Writing Style Selection Agent",
             goal="Choose the most suitable writing style for a given AI-related blog topic and explain why.",
@@ -89,6 +89,8 @@ class ArticleStructureAgent:
         self.llm = llm
 
     def make_agent(self):
+        from crewai import Agent
+
         return Agent(
             role="AI Blog Structure Designer",
             goal="Create a detailed, style-aligned structure for a blog post that matches the given topic and writing style.",
@@ -170,6 +172,9 @@ class SearchAndScrapeAgent:
         Returns:
             Agent: An instance of the Agent class with web search and scraping capabilities.
         """
+        from crewai import Agent
+        from tools.web_tools import get_search_results_tool, scrape_search_results_tool
+
         return Agent(
             role="Web Search and Scraping Agent",
             goal="Perform a search using a keyword and scrape clean content from the top 5 result pages.",
@@ -218,6 +223,8 @@ class WriterAgent:
         Returns:
             Agent: An instance configured to write a clear, human-style technical article.
         """
+        from crewai import Agent
+
         return Agent(
             role="Markdown Maestro & Article Writer",
             goal="Write a witty, markdown-formatted, human-style article using a given outline and tone.",
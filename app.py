@@ -1,31 +1,163 @@
-from flask import Flask, render_template, request, jsonify
+import json
 
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context, url_for
 
-from core.article_manger import ArticleMaker
-from crewai import LLM
+
+from core.article_archive import get_article_archive
+from core.article_cache import article_key, get_article_store
+from core.jobs import JobManager, QueueFullError
+from core.metrics import render_metrics
+from core.pipeline import LazyPipeline
 from config import DefaultCFG
 
-llm = LLM(
-    model=DefaultCFG.llm_model,
-    api_key=DefaultCFG.api_key
-)
+# crewai, the LLM and the agents are loaded on first use (or by the warm-up thread),
+# so the server starts answering right away
+pipeline = LazyPipeline()
+if DefaultCFG.warmup_on_start:
+    pipeline.warm_up()
+
 
+def _run(topic, **kwargs):
+    return pipeline.get().make(topic, **kwargs)
 
-maker = ArticleMaker(llm)
+
+# identical topics share one generation while it runs and are answered from the store after
+jobs = JobManager(_run, key=article_key, store=get_article_store())
 
 # Start
 app = Flask(__name__)
 
+
+def _submit(topic):
+    try:
+        return jobs.submit(topic), None
+    except QueueFullError as e:
+        response = jsonify({"error": f"Too many articles in progress: {e}. Try again shortly."})
+        response.status_code = 429
+        response.headers["Retry-After"] = "30"
+        return None, response
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
-        topic = request.form.get("topic")
+        topic = (request.form.get("topic") or "").strip()
+        if not topic:
+            return jsonify({"error": "A non-empty 'topic' is required."}), 400
 
-        generated_article = maker.make(topic)
+        job, busy = _submit(topic)
+        if busy:
+            return busy
+        job.future.result()
+        if job.status == "failed":
+            return jsonify({"error": job.error}), 500
 
-        print(f"Generated article for topic '{topic}': {generated_article}")
-        return jsonify({"article": generated_article})
+        app.logger.info("Generated article for topic '%s' (%d characters)", topic, len(job.result))
+        return jsonify({"article": job.result})
     return render_template("index.html")
 
+
+@app.route("/jobs", methods=["POST"])
+def create_job():
+    payload = request.get_json(silent=True) or request.form
+    topic = (payload.get("topic") or "").strip()
+    if not topic:
+        return jsonify({"error": "A non-empty 'topic' is required."}), 400
+
+    job, busy = _submit(topic)
+    if busy:
+        return busy
+    return jsonify({
+        **job.to_dict(),
+        "status_url": url_for("job_status", job_id=job.id),
+        "result_url": url_for("job_result", job_id=job.id),
+        "events_url": url_for("job_events", job_id=job.id),
+    }), 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    if job.status == "failed":
+        return jsonify({**job.to_dict(), "error": job.error}), 500
+    if job.status != "done":
+        return jsonify(job.to_dict()), 202
+    return jsonify({**job.to_dict(), "article": job.result})
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """Stream the job's progress as server-sent events, replaying what already happened."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id."}), 404
+
+    def generate():
+        for event in job.events.follow(timeout=15):
+            yield event.to_sse() if event is not None else ": keep-alive\n\n"
+        yield f"event: end\ndata: {json.dumps({'status': job.status})}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/articles", methods=["GET"])
+def list_articles():
+    """Archived articles, newest first or best match for `q` first, paginated with `page` and `per_page`."""
+    archive = get_article_archive()
+    if archive is None:
+        return jsonify({"error": "The article archive is disabled."}), 404
+    result = archive.search(
+        request.args.get("q"),
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 20, type=int),
+    )
+    for item in result["items"]:
+        item["url"] = url_for("get_article", article_id=item["id"])
+    return jsonify(result)
+
+
+@app.route("/articles/<int:article_id>", methods=["GET"])
+def get_article(article_id):
+    """One archived article with its writing style, outline, sources and stage timings."""
+    archive = get_article_archive()
+    record = archive.get(article_id) if archive is not None else None
+    if record is None:
+        return jsonify({"error": "Unknown article id."}), 404
+    return jsonify(record)
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the server process is up."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: 200 once the pipeline is built, 503 while it is still warming up or failed to build."""
+    body = {"pipeline": pipeline.status(), "queue_depth": jobs.queue_depth()}
+    return jsonify(body), 200 if pipeline.ready else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics: stage and LLM timings, token counts, fetches and cache hit rates."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,136 @@
+"""
+Generate articles for a list of topics and append the results to a JSONL file.
+
+    python batch.py topics.txt --out articles.jsonl --workers 4 --rpm 60
+
+The topics file holds one topic per line (blank lines and lines starting with '#'
+are ignored). Every finished topic is written as one JSON line right away, so a
+crashed or interrupted batch can simply be started again: topics that already have
+a successful record in the output file are skipped, and failed topics resume from
+the stage checkpoints of their last attempt.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import DefaultCFG
+
+
+def read_topics(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as file:
+        topics = [line.strip() for line in file]
+    return list(dict.fromkeys(t for t in topics if t and not t.startswith("#")))
+
+
+def read_progress(path: str) -> tuple:
+    """
+    Scan an output file from an earlier batch.
+
+    Returns:
+        tuple: The set of topics with a successful record, and a dict mapping failed
+            topics to the run id of their latest resumable attempt.
+    """
+    done, run_ids = set(), {}
+    if not os.path.exists(path):
+        return done, run_ids
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            if record.get("status") == "ok":
+                done.add(record["topic"])
+            elif record.get("run_id"):
+                run_ids[record["topic"]] = record["run_id"]
+    return done, run_ids
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def build_maker(rpm: int):
+    from crewai import LLM
+    from core.article_manger import ArticleMaker
+    from core.llm_wrappers import RateLimitedLLM
+
+    def build_llm(model: str = None):
+        llm = LLM(
+            model=model or DefaultCFG.llm_model,
+            api_key=DefaultCFG.api_key
+        )
+        if rpm > 0:
+            llm = RateLimitedLLM(llm, rpm)  # providers limit requests per model
+        return llm
+
+    return ArticleMaker(build_llm(), llm_factory=build_llm)
+
+
+_process_maker = None
+
+
+def _init_process(rpm: int):
+    global _process_maker
+    _process_maker = build_maker(rpm)
+
+
+def _make_in_process(topic: str, run_id: str = None) -> dict:
+    return _process_maker.make_record(topic, run_id)
+
+
+def run_batch(topics: list, out_path: str, workers: int, executor: str = "thread", rpm: int = 0):
+    """
+    Generate every topic not yet completed in `out_path`, appending one JSON line per topic.
+
+    Args:
+        topics: Topics to generate.
+        out_path: JSONL file to append to; existing successful records are skipped and
+            failed ones resume from their checkpoints.
+        workers: Number of concurrent generations.
+        executor: "thread" to share one ArticleMaker, or "process" for one per worker process.
+        rpm: LLM requests-per-minute budget for the whole batch, 0 for unlimited. With
+            processes each worker gets an equal share.
+    """
+    done, run_ids = read_progress(out_path)
+    todo = [t for t in topics if t not in done]
+    print(f"{len(done)} topics already done, {len(todo)} to generate")
+    if not todo:
+        return
+
+    if executor == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_process, initargs=(max(rpm // workers, 1) if rpm else 0,)
+        )
+        records = (f.result() for f in as_completed([pool.submit(_make_in_process, t, run_ids.get(t)) for t in todo]))
+    else:
+        pool = None
+        records = build_maker(rpm).make_many(todo, max_workers=workers, run_ids=run_ids)
+
+    try:
+        with open(out_path, "a+", encoding="utf-8") as out:
+            if out.tell() and not _ends_with_newline(out_path):
+                out.write("\n")  # terminate a line cut short by a crash
+            for i, record in enumerate(records, 1):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                print(f"[{i}/{len(todo)}] {record['status']:5} {record['duration']:7.1f}s  {record['topic']}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate articles for a list of topics.")
+    parser.add_argument("topics", help="Text file with one topic per line")
+    parser.add_argument("--out", default="articles.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--workers", type=int, default=DefaultCFG.batch_workers)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--rpm", type=int, default=DefaultCFG.llm_max_rpm,
+                        help="LLM requests per minute across all workers (0 = unlimited)")
+    args = parser.parse_args()
+
+    run_batch(read_topics(args.topics), args.out, args.workers, args.executor, args.rpm)
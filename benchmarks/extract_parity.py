@@ -0,0 +1,108 @@
+"""
+Randomized parity check of the two page text extractors.
+
+Generates HTML documents, including malformed ones (unclosed and stray tags, skip
+tags closed by an ancestor, void and self-closing tags), and checks that the
+streaming extractor returns exactly what the BeautifulSoup extractor returns when the
+body arrives in random chunks:
+
+    python -m benchmarks.extract_parity --cases 2000 --seed 1
+
+Exits with status 1 and prints the first mismatching documents otherwise.
+"""
+import argparse
+import random
+import sys
+from typing import List
+
+from tools.html_extract import SKIP_TAGS, extract_text, extract_text_stream
+
+CONTAINERS = ("div", "p", "section", "article", "main", "span", "li", "td", "b") + SKIP_TAGS
+VOIDS = ("br", "img", "hr", "meta", "input")
+WORDS = "the quick brown fox jumps over a lazy dog while research pages load &amp; café &lt;tag&gt;".split()
+
+
+class _ChunkedResponse:
+    """The part of requests.Response that extract_text_stream uses, serving a body in random chunks."""
+
+    def __init__(self, body: bytes, rng: random.Random):
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+        self.encoding = "utf-8"
+        self._body = body
+        self._rng = rng
+
+    def iter_content(self, chunk_size: int):
+        position = 0
+        while position < len(self._body):
+            size = self._rng.randint(1, 64)
+            yield self._body[position:position + size]
+            position += size
+
+    def close(self):
+        pass
+
+
+def _text(rng: random.Random) -> str:
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 16)))
+    return words + ("\n" if rng.random() < 0.3 else "")
+
+
+def random_document(rng: random.Random, parts: int = 60) -> str:
+    """A document whose tags are well nested or, with some probability, left open, closed early or stray."""
+    out: List[str] = []
+    open_tags: List[str] = []
+    for _ in range(parts):
+        roll = rng.random()
+        if roll < 0.3:
+            tag = rng.choice(CONTAINERS)
+            out.append(f"<{tag} class=\"x\">")
+            open_tags.append(tag)
+        elif roll < 0.5 and open_tags:
+            tag = open_tags.pop()
+            if rng.random() < 0.2 and open_tags:
+                # close an ancestor, leaving the inner elements unclosed
+                tag = open_tags.pop(rng.randrange(len(open_tags)))
+            if rng.random() < 0.85:
+                out.append(f"</{tag}>")
+        elif roll < 0.55:
+            out.append(f"</{rng.choice(CONTAINERS + VOIDS)}>")  # stray end tag
+        elif roll < 0.62:
+            out.append(f"<{rng.choice(VOIDS)}>" if rng.random() < 0.5 else f"<{rng.choice(CONTAINERS)}/>")
+        elif roll < 0.65:
+            out.append(f"<!-- {_text(rng)} -->")
+        else:
+            out.append(_text(rng))
+    if rng.random() < 0.5:
+        out.extend(f"</{tag}>" for tag in reversed(open_tags))
+    return "".join(out)
+
+
+def check(cases: int, seed: int, show: int = 3) -> int:
+    """Compare both extractors on `cases` random documents; return the number of mismatches."""
+    rng = random.Random(seed)
+    mismatches = 0
+    for case in range(cases):
+        html = random_document(rng)
+        max_lines = rng.choice((3, 15))
+        expected = extract_text(html, max_lines=max_lines)
+        actual = extract_text_stream(_ChunkedResponse(html.encode("utf-8"), rng), max_bytes=1 << 30,
+                                     max_lines=max_lines)
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= show:
+                print(f"case {case}:\n  html:   {html!r}\n  soup:   {expected!r}\n  stream: {actual!r}")
+    return mismatches
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    mismatches = check(args.cases, args.seed)
+    print(f"{args.cases - mismatches}/{args.cases} documents extracted identically")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Local HTTP fixtures for the benchmarks: a page server and the Serper stand-in.
+
+Pages come from a directory of saved HTML files, or are generated deterministically
+when no directory is given, so scraping can be measured without touching the network.
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from tools.search_backends import LocalSearchBackend
+from tools.serper_stub import make_server as make_serper_server
+
+_WORDS = (
+    "agent model tool memory planning python crew latency cache network vector graph "
+    "prompt context token stream search scrape outline section article writer style"
+).split()
+
+
+def generate_page(index: int, size: int) -> str:
+    """
+    Build a realistic HTML page of roughly `size` bytes.
+
+    The page has the parts the extractors must cope with: head scripts and styles,
+    navigation, long article paragraphs and a boilerplate footer.
+    """
+    rng = random.Random(index)
+    head = (
+        f"<html><head><title>Fixture page {index}</title>"
+        "<style>body{font-family:sans-serif} .nav a{margin:4px}</style>"
+        "<script>window.analytics = {track: function(){}};</script></head><body>"
+        "<nav class='nav'>" + "".join(f"<a href='/p/{i}'>Link {i}</a>" for i in range(20)) + "</nav><article>"
+    )
+    tail = "</article><footer><p>Subscribe to our newsletter for weekly updates on agents.</p></footer></body></html>"
+    parts, length = [head], len(head) + len(tail)
+    while length < size:
+        paragraph = "<p>" + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(20, 80))) + ".</p>\n"
+        parts.append(paragraph)
+        length += len(paragraph)
+    parts.append(tail)
+    return "".join(parts)
+
+
+def load_corpus(directory: str = None, pages: int = 10, page_size: int = 200_000) -> Dict[str, bytes]:
+    """Return the pages to serve keyed by name: the .html files of `directory`, or generated ones."""
+    if directory:
+        return {
+            os.path.splitext(name)[0]: open(os.path.join(directory, name), "rb").read()
+            for name in sorted(os.listdir(directory)) if name.endswith(".html")
+        }
+    return {str(i): generate_page(i, page_size).encode("utf-8") for i in range(pages)}
+
+
+def make_page_server(corpus: Dict[str, bytes], host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Build (but do not start) a server answering GET /pages/<name> from `corpus`."""
+
+    class PageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = corpus.get(self.path.rstrip("/").rsplit("/", 1)[-1]) if self.path.startswith("/pages/") else None
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), PageHandler)
+
+
+class Fixtures:
+    """
+    Page server plus Serper stand-in answering every query with the corpus URLs.
+
+    Use as a context manager; `page_urls` and `search_endpoint` are set once entered.
+    """
+
+    def __init__(self, corpus: Dict[str, bytes]):
+        self.corpus = corpus
+        self.page_urls: List[str] = []
+        self.search_endpoint = None
+        self._servers = []
+        self._search_file = None
+
+    def __enter__(self):
+        pages = make_page_server(self.corpus)
+        base = f"http://127.0.0.1:{pages.server_address[1]}/pages"
+        self.page_urls = [f"{base}/{name}" for name in self.corpus]
+
+        fd, self._search_file = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"*": [{"title": f"Fixture {i}", "link": url} for i, url in enumerate(self.page_urls)]}, file)
+        serper = make_serper_server(LocalSearchBackend(self._search_file), port=0)
+        self.search_endpoint = f"http://127.0.0.1:{serper.server_address[1]}/search"
+
+        for server in (pages, serper):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers.append(server)
+        return self
+
+    def __exit__(self, *exc):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        os.remove(self._search_file)
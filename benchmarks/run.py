@@ -0,0 +1,249 @@
+"""
+Offline benchmark suite for the article pipeline.
+
+Runs the pipeline against StubLLM and local fixture servers, so nothing is sent to
+Gemini or Serper, and writes flat JSON results that can be compared between runs:
+
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --out new.json --compare bench.json --tolerance 0.15
+
+Metric names ending in `_per_s` are throughputs (higher is better); other names
+ending in `_s` are durations in seconds (lower is better).
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from config import DefaultCFG
+from benchmarks.fixtures import Fixtures, load_corpus
+from benchmarks.stub_llm import StubLLM
+
+BENCHMARKS = ("make", "scrape", "filter", "flask")
+
+
+def summarize(name: str, samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        f"{name}.min_s": ordered[0],
+        f"{name}.median_s": statistics.median(ordered),
+        f"{name}.p95_s": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        f"{name}.mean_s": statistics.fmean(ordered),
+    }
+
+
+def timed(call: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
+
+
+def configure_offline(fixtures: Fixtures):
+    """Point the pipeline at the fixtures and turn off every cache and side effect that would skew timings."""
+    from tools.search_backends import SerperBackend, set_search_backend
+
+    DefaultCFG.search_backend = "serper"
+    DefaultCFG.serper_endpoint = fixtures.search_endpoint
+    DefaultCFG.research_mode = "direct"
+    DefaultCFG.page_cache_enabled = False
+    DefaultCFG.llm_cache_stages = ()
+    DefaultCFG.checkpoints_enabled = False
+    DefaultCFG.crew_memory = False
+    DefaultCFG.research_index_enabled = False
+    DefaultCFG.archive_enabled = False
+    DefaultCFG.trace_dir = ""
+    DefaultCFG.llm_stream = False
+    DefaultCFG.warmup_on_start = False
+    set_search_backend(SerperBackend(api_key="benchmark", endpoint=fixtures.search_endpoint))
+
+
+def bench_make(args) -> Dict[str, float]:
+    """End-to-end ArticleMaker.make latency in both writing modes."""
+    from core.article_manger import ArticleMaker
+
+    results = {}
+    for mode in ("single", "sections"):
+        DefaultCFG.writing_mode = mode
+        llm = StubLLM(args.llm_latency)
+        maker = ArticleMaker(llm)
+        maker.make("benchmark warmup")
+        llm.calls = 0
+        # distinct topics, so the in-memory search cache does not answer repeats
+        samples = [timed(lambda i=i: maker.make(f"benchmark {mode} {i}")) for i in range(args.repeat)]
+        results.update(summarize(f"make.{mode}", samples))
+        results[f"make.{mode}.llm_calls"] = llm.calls / args.repeat
+    DefaultCFG.writing_mode = "single"
+    return results
+
+
+def bench_scrape(args, fixtures: Fixtures) -> Dict[str, float]:
+    """Throughput of scraping every corpus page, with both extraction modes."""
+    from tools.web_tools import scrape_urls
+
+    corpus_mb = sum(len(page) for page in fixtures.corpus.values()) / 1e6
+    results = {}
+    for mode in ("stream", "soup"):
+        DefaultCFG.scrape_extraction = mode
+        scrape_urls(fixtures.page_urls)
+        samples = [timed(lambda: scrape_urls(fixtures.page_urls)) for _ in range(args.repeat)]
+        results.update(summarize(f"scrape.{mode}", samples))
+        results[f"scrape.{mode}.pages_per_s"] = len(fixtures.page_urls) / statistics.median(samples)
+        results[f"scrape.{mode}.corpus_mb_per_s"] = corpus_mb / statistics.median(samples)
+    DefaultCFG.scrape_extraction = "stream"
+    return results
+
+
+def bench_filter(args) -> Dict[str, float]:
+    """filter_article throughput on a large Markdown article."""
+    from utils import filter_article
+
+    article = "```markdown\n" + "\n\n".join(
+        f"## Section {i}\n\n" + "Agents plan, call tools and write. " * 200 + "\n```python\nprint('hi')\n```"
+        for i in range(200)
+    )
+    loops = 20
+    samples = [timed(lambda: [filter_article(article) for _ in range(loops)]) / loops for _ in range(args.repeat)]
+    results = summarize("filter_article", samples)
+    results["filter_article.mb_per_s"] = len(article) / 1e6 / statistics.median(samples)
+    return results
+
+
+def bench_flask(args) -> Dict[str, float]:
+    """Latency and throughput of POST / at increasing client concurrency."""
+    import requests
+    from werkzeug.serving import make_server
+
+    import app as flask_app
+    from core.article_manger import ArticleMaker
+    from core.jobs import JobManager
+    from core.pipeline import LazyPipeline
+
+    flask_app.pipeline = LazyPipeline(lambda: ArticleMaker(StubLLM(args.llm_latency)))
+    flask_app.pipeline.get()
+    flask_app.jobs = JobManager(flask_app._run, max_pending=max(args.concurrency) * 2)
+    server = make_server("127.0.0.1", 0, flask_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    results = {}
+    try:
+        for clients in args.concurrency:
+            def request(i, clients=clients):
+                started = time.perf_counter()
+                response = requests.post(url, data={"topic": f"flask {clients} {i}"}, timeout=600)
+                return time.perf_counter() - started, response.status_code
+
+            total = clients * args.requests_per_client
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                outcomes = list(executor.map(request, range(total)))
+            elapsed = time.perf_counter() - started
+
+            ok = [seconds for seconds, status in outcomes if status == 200]
+            if ok:
+                results.update(summarize(f"flask.c{clients}", ok))
+            results[f"flask.c{clients}.requests_per_s"] = len(ok) / elapsed
+            results[f"flask.c{clients}.errors"] = total - len(ok)
+    finally:
+        server.shutdown()
+        flask_app.jobs.shutdown()
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Return a line for every metric that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, value in sorted(results.items()):
+        before = baseline.get(name)
+        if not before or not isinstance(value, (int, float)):
+            continue
+        if name.endswith("_per_s"):
+            change = (before - value) / before
+        elif name.endswith("_s"):
+            change = (value - before) / before
+        else:
+            continue
+        if change > tolerance:
+            regressions.append(f"{name}: {before:.4g} -> {value:.4g} ({change:+.0%} worse)")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the article pipeline offline.")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"comma-separated subset of {BENCHMARKS}")
+    parser.add_argument("--repeat", type=int, default=3, help="samples per measurement")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per stub LLM call")
+    parser.add_argument("--corpus", help="directory of saved .html pages to serve instead of generated ones")
+    parser.add_argument("--pages", type=int, default=10, help="generated pages when no --corpus is given")
+    parser.add_argument("--page-size", type=int, default=500_000, help="bytes per generated page")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 2, 4, 8],
+                        help="comma-separated client counts for the flask benchmark")
+    parser.add_argument("--requests-per-client", type=int, default=2)
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    selected = [name for name in args.only.split(",") if name]
+
+    results = {}
+    with Fixtures(load_corpus(args.corpus, args.pages, args.page_size)) as fixtures:
+        configure_offline(fixtures)
+        for name in selected:
+            print(f"running {name}...", file=sys.stderr)
+            if name == "make":
+                results.update(bench_make(args))
+            elif name == "scrape":
+                results.update(bench_scrape(args, fixtures))
+            elif name == "filter":
+                results.update(bench_filter(args))
+            elif name == "flask":
+                results.update(bench_flask(args))
+            else:
+                parser.error(f"unknown benchmark '{name}'")
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    for name, value in sorted(results.items()):
+        print(f"{name:45s} {value:.4g}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
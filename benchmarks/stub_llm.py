@@ -0,0 +1,91 @@
+"""
+Deterministic stand-in for crewai.LLM used by the benchmarks.
+
+Answers every agent of the pipeline with a fixed, schema-valid response after a
+configurable delay, so runs cost nothing and are repeatable.
+"""
+import json
+import re
+import time
+
+from crewai.llms.base_llm import BaseLLM
+
+SECTION_COUNT = 6
+
+_RESEARCH = {
+    "keyword": "benchmark",
+    "urls": ["http://127.0.0.1/pages/0"],
+    "results": [{"url": "http://127.0.0.1/pages/0", "content": "Benchmark research content."}],
+}
+_STYLE = {"topic": "benchmark", "style": "clear explanatory tone", "reason": "Benchmarks need stable output."}
+_STRUCTURE = {
+    "sections": [
+        {
+            "title": f"Section {i + 1}",
+            "length": "at least 300 words",
+            "subsections": [f"Point {i + 1}.1", f"Point {i + 1}.2"],
+            "code_examples": "",
+            "code_explanations": "",
+        }
+        for i in range(SECTION_COUNT)
+    ],
+    "tone": "friendly and precise",
+    "writing_tips": ["Use short sentences.", "Explain every term."],
+}
+_SECTION_PROMPT = re.compile(r"You are writing section (\d+) of (\d+)")
+
+
+def _paragraphs(count: int, seed: int) -> str:
+    return "\n\n".join(
+        f"Paragraph {seed}.{i}: agents plan, call tools and write results, and latency adds up at every step."
+        for i in range(count)
+    )
+
+
+class StubLLM(BaseLLM):
+    """
+    BaseLLM returning canned pipeline responses.
+
+    Args:
+        latency: Seconds every call sleeps before answering.
+        writer_latency: Seconds a whole-article writer call sleeps; defaults to
+            `latency` times the number of outline sections, since one call writes them all.
+    """
+
+    def __init__(self, latency: float = 0.2, writer_latency: float = None):
+        super().__init__(model="stub/benchmark")
+        self.latency = latency
+        self.writer_latency = latency * SECTION_COUNT if writer_latency is None else writer_latency
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.calls += 1
+        text = messages if isinstance(messages, str) else "\n".join(str(m.get("content", "")) for m in messages)
+
+        section = _SECTION_PROMPT.search(text)
+        if section:
+            time.sleep(self.latency)
+            index = int(section.group(1))
+            return f"Final Answer: ## Section {index}\n\n{_paragraphs(4, index)}"
+        if "Markdown Maestro" in text:
+            time.sleep(self.writer_latency)
+            body = "\n\n".join(f"## Section {i + 1}\n\n{_paragraphs(4, i + 1)}" for i in range(SECTION_COUNT))
+            return f"Final Answer: # Benchmark article\n\n{body}"
+
+        time.sleep(self.latency)
+        if "AI Blog Structure Designer" in text:
+            answer = _STRUCTURE
+        elif "Writing Style Selection Agent" in text:
+            answer = _STYLE
+        else:
+            answer = _RESEARCH
+        return "Final Answer: " + json.dumps(answer)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
@@ -1,9 +1,141 @@
 
 from dataclasses import dataclass
+from typing import Tuple
 
 @dataclass
 class DefaultCFG:
 
     api_key: str = "YOUR-API"
     llm_model: str = "gemini/gemini-2.0-flash"
+    llm_stream: bool = True            # stream completions so progress can be shown while writing
 
+    # Per-stage model routing: (stage, model) pairs for stages that should not use llm_model.
+    # Stages are "search_scrape", "writing_style", "article_structure" and "article_writing".
+    stage_models: Tuple[Tuple[str, str], ...] = (
+        ("search_scrape", "gemini/gemini-2.0-flash-lite"),   # only reformats scraped text
+        ("writing_style", "gemini/gemini-2.0-flash-lite"),   # picks a tone from a short brief
+    )
+    # A call of a stage listed here still running after its budget (seconds) is raced
+    # against fallback_model, and the first answer is used; a stage routed to
+    # fallback_model itself has nothing to fall back to
+    stage_latency_budgets: Tuple[Tuple[str, float], ...] = (
+        ("article_structure", 30.0),
+    )
+    fallback_model: str = "gemini/gemini-2.0-flash-lite"
+
+    # Page fetching for scrape_search_results_tool
+    scrape_max_workers: int = 8        # pages fetched at the same time, including hedged backups
+    scrape_timeout: float = 10.0       # per-request connect/read timeout (seconds)
+    scrape_deadline: float = 15.0      # overall budget for one batch of urls (seconds)
+    scrape_extraction: str = "stream"  # "stream" (bounded, incremental) or "soup" (full BeautifulSoup parse)
+    scrape_max_bytes: int = 2 * 1024 * 1024
+
+    # On-disk cache of scraped page text
+    page_cache_enabled: bool = True
+    page_cache_path: str = ".cache/pages.sqlite3"
+    page_cache_ttl: float = 24 * 3600            # serve without revalidation for a day
+    page_cache_max_bytes: int = 50 * 1024 * 1024  # LRU eviction above this size
+
+    # Web search for get_search_results_tool
+    search_backend: str = "serper"              # "serper" or "local"
+    serper_api_key: str = "YOUR-SERPER-API"
+    serper_endpoint: str = "https://google.serper.dev/search"
+    local_search_path: str = "search_results.json"
+    search_cache_ttl: float = 6 * 3600
+    search_cache_max_entries: int = 1024
+
+    # Background generation jobs in app.py
+    job_workers: int = 2               # concurrent generations
+    job_max_pending: int = 16          # queued jobs beyond this get HTTP 429
+    job_retention: float = 3600        # seconds a finished job's result stays available
+
+    # Batch generation (batch.py)
+    batch_workers: int = 4
+    llm_max_rpm: int = 0               # shared LLM requests-per-minute budget, 0 = unlimited
+
+    # Cache of LLM responses, enabled per pipeline stage
+    llm_cache_stages: Tuple[str, ...] = ("writing_style", "article_structure")
+    llm_cache_path: str = ".cache/llm.sqlite3"
+    llm_cache_ttl: float = 7 * 24 * 3600
+    llm_cache_max_bytes: int = 100 * 1024 * 1024
+
+    # Stage checkpoints and retries
+    checkpoints_enabled: bool = True
+    checkpoint_dir: str = ".cache/checkpoints"
+    checkpoint_ttl: float = 7 * 24 * 3600   # failed runs stay resumable this long
+    stage_retries: int = 1                  # extra attempts for a failed stage
+    stage_retry_backoff: float = 2.0        # seconds, multiplied by the attempt number
+
+    # Crew memory, shared by all requests of an ArticleMaker
+    crew_memory: bool = True
+    embedder_provider: str = "local"    # "local" hashing embedder (no network) or "google"
+    embedder_model: str = "models/text-embedding-004"  # used with "google"
+
+    # Verification of the finished article: links and images are checked with HEAD requests,
+    # dead ones are dropped ("drop") or only reported ("report"), section lengths are compared
+    # with the outline
+    article_verification: bool = True
+    link_check_action: str = "drop"
+    link_check_workers: int = 32
+    link_check_timeout: float = 1.0         # per request (seconds)
+    link_check_deadline: float = 1.5        # for all links of an article (seconds)
+    link_cache_enabled: bool = True
+    link_cache_path: str = ".cache/links.sqlite3"
+    link_cache_ttl: float = 7 * 24 * 3600   # working links
+    link_cache_dead_ttl: float = 24 * 3600  # dead links
+
+    # Archive of every generated article with its style, outline, sources and timings,
+    # searchable from the history endpoints and the Streamlit history view
+    archive_enabled: bool = True
+    archive_path: str = "data/articles.sqlite3"
+    archive_compression_level: int = 9      # zstd level when `zstandard` is installed, else zlib (max 9)
+
+    # Local index of scraped research: research of the same topic replaces searching and
+    # scraping, research of related topics is added to the freshly scraped pages
+    research_index_enabled: bool = True
+    research_index_path: str = ".cache/research_index"
+    research_index_dim: int = 512               # hashing embedding size, fixed per index
+    research_index_reuse_similarity: float = 0.95  # cosine at which a past topic counts as the same
+    research_index_topic_similarity: float = 0.5   # cosine at which a past topic counts as related
+    research_index_min_passages: int = 8        # fewer matching passages than this are not used
+    research_index_top_k: int = 40              # passages recalled, before compression
+    research_index_max_age: float = 7 * 24 * 3600  # older passages are not recalled (seconds), 0 = no limit
+
+    # Article writing: "single" writes the whole article in one call, "sections" writes
+    # each outline section with its own call and stitches them in order
+    writing_mode: str = "single"
+    section_workers: int = 4
+
+    # Research stage: "direct" searches and scrapes in Python and builds SearchAndScrapeOutput
+    # itself, falling back to the tool-calling agent ("agent") when nothing usable comes back
+    research_mode: str = "direct"
+    research_results: int = 5
+
+    # Compression of directly scraped research before it is passed to the downstream tasks
+    research_token_budget: int = 1500       # approximate tokens of scraped text, 0 for no limit
+    research_dedupe_threshold: float = 0.8  # estimated Jaccard similarity of near-duplicate passages
+
+    # Tracing: a JSON trace per run (stage timings, LLM calls, fetches, cache stats) is
+    # written to this directory when set; Prometheus metrics are always served at /metrics
+    trace_dir: str = ""
+
+    # Startup: build the pipeline in a background thread as soon as the web app starts,
+    # instead of on the first request
+    warmup_on_start: bool = True
+
+    # Finished articles kept by the web tier, keyed by normalized topic and pipeline settings
+    article_cache_enabled: bool = True
+    article_cache_ttl: float = 3600
+    article_cache_max_entries: int = 256
+
+    # Tail latency of the research stage: extra search results are fetched as backups
+    # when a page takes longer than the given percentile of recent fetch times
+    research_overfetch: int = 3
+    scrape_hedge_percentile: float = 0.9
+    scrape_hedge_min_delay: float = 1.0     # seconds
+    scrape_hedge_delay: float = 3.0         # seconds, used until enough fetches were timed
+    # Per-domain circuit breakers: skip a domain for breaker_cooldown seconds after
+    # breaker_failures consecutive failed (or slower than breaker_slow_seconds) fetches
+    breaker_failures: int = 3
+    breaker_cooldown: float = 300
+    breaker_slow_seconds: float = 8.0
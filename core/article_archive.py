@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import zlib
+from threading import Lock
+from typing import Optional
+
+from config import DefaultCFG
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional: bodies are compressed with zlib instead
+    zstandard = None
+
+PREVIEW_CHARS = 240
+_MARKUP = re.compile(r"[#*_`>\[\]!|]+|\(https?://[^)]*\)")
+
+
+def _compress(text: str) -> tuple:
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=DefaultCFG.archive_compression_level).compress(data)
+    return "zlib", zlib.compress(data, min(9, DefaultCFG.archive_compression_level))
+
+
+def _decompress(codec: str, blob: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This article was stored with zstd; install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def plain_text(markdown: str) -> str:
+    """Markdown with markup characters and link targets removed, for indexing and previews."""
+    return re.sub(r"\s+", " ", _MARKUP.sub(" ", markdown)).strip()
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching rows that contain every word.
+
+    Words are split the way the unicode61 tokenizer splits them (underscores separate
+    words), so each quoted word is a single token, which the position-free index needs.
+    Quoting takes FTS5 operators in user input literally, and the last word matches as
+    a prefix so results show up while a word is still being typed.
+    """
+    words = re.findall(r"[^\W_]+", text)
+    if not words:
+        return ""
+    return " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+
+
+class ArticleArchive:
+    """
+    Persistent SQLite store of every generated article.
+
+    Bodies are stored compressed (zstd when the `zstandard` package is installed,
+    otherwise zlib) next to the writing style, the outline, the source URLs and the
+    stage timings of the run. Topic and plain text are indexed in a contentless FTS5
+    table, which holds only the index and not a second copy of the text; search results
+    are ranked with BM25 and carry a short uncompressed preview.
+
+    Attributes:
+        path: Location of the SQLite file.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Initialize the ArticleArchive.
+
+        Args:
+            path: SQLite file location, defaults to DefaultCFG.archive_path.
+        """
+        self.path = path or DefaultCFG.archive_path
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " id INTEGER PRIMARY KEY, run_id TEXT UNIQUE, topic TEXT, created_at REAL, words INTEGER,"
+            " preview TEXT, codec TEXT, body BLOB, style TEXT, structure TEXT, sources TEXT, timings TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_created ON articles(created_at)")
+        # contentless and without token positions: the index stays a fraction of the text's size
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            " topic, text, content='', detail=column, tokenize='porter unicode61')"
+        )
+        self._conn.commit()
+
+    def save(self, topic: str, article: str, run_id: str = None, style: dict = None, structure: dict = None,
+             sources: list = None, timings: dict = None) -> int:
+        """
+        Store an article and index it.
+
+        Args:
+            topic: The topic it was written for.
+            article: The Markdown article.
+            run_id: Id of the run that produced it; saving the same run twice keeps the first.
+            style: The WritingStyleOutput of the run, as a dict.
+            structure: The ArticleStructureOutput of the run, as a dict.
+            sources: URLs the research came from.
+            timings: The stage timing report of the run.
+
+        Returns:
+            int: The article id.
+        """
+        text = plain_text(article)
+        codec, body = _compress(article)
+        with self._lock:
+            if run_id:
+                row = self._conn.execute("SELECT id FROM articles WHERE run_id = ?", (run_id,)).fetchone()
+                if row is not None:
+                    return row["id"]
+            cursor = self._conn.execute(
+                "INSERT INTO articles (run_id, topic, created_at, words, preview, codec, body, style, structure,"
+                " sources, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, topic, time.time(), len(text.split()), text[:PREVIEW_CHARS], codec, body,
+                 json.dumps(style), json.dumps(structure), json.dumps(sources or []), json.dumps(timings)),
+            )
+            self._conn.execute("INSERT INTO articles_fts (rowid, topic, text) VALUES (?, ?, ?)",
+                               (cursor.lastrowid, topic, text))
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def search(self, query: str = None, page: int = 1, per_page: int = 20) -> dict:
+        """
+        Return one page of articles, newest first, or best match first when `query` is given.
+
+        A query the full-text index cannot run gives an empty page instead of an error.
+
+        Returns:
+            dict: `items` (id, topic, created_at, words and preview of each article),
+                `page`, `per_page` and `total`.
+        """
+        page, per_page = max(1, page), max(1, min(per_page, 100))
+        offset = (page - 1) * per_page
+        columns = "a.id, a.topic, a.created_at, a.words, a.preview"
+        match = fts_query(query or "")
+        with self._lock:
+            if match:
+                try:
+                    total = self._conn.execute(
+                        "SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ?", (match,)
+                    ).fetchone()[0]
+                    rows = self._conn.execute(
+                        f"SELECT {columns} FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+                        " WHERE articles_fts MATCH ? ORDER BY bm25(articles_fts, 4.0, 1.0) LIMIT ? OFFSET ?",
+                        (match, per_page, offset),
+                    ).fetchall()
+                except sqlite3.OperationalError as e:
+                    logger.warning("Archive search for %r failed: %s", query, e)
+                    total, rows = 0, []
+            elif query and query.strip():
+                total, rows = 0, []
+            else:
+                total = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM articles a ORDER BY a.id DESC LIMIT ? OFFSET ?", (per_page, offset)
+                ).fetchall()
+        return {"items": [dict(row) for row in rows], "page": page, "per_page": per_page, "total": total}
+
+    def get(self, article_id: int) -> Optional[dict]:
+        """Return an article with its body, style, outline, sources and timings, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM articles WHERE id = ?", (article_id,)).fetchone()
+        if row is None:
+            return None
+        record = {key: row[key] for key in ("id", "run_id", "topic", "created_at", "words")}
+        record["article"] = _decompress(row["codec"], row["body"])
+        for key in ("style", "structure", "sources", "timings"):
+            record[key] = json.loads(row[key]) if row[key] else None
+        return record
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM articles"
+            ).fetchone()
+        return {"articles": count, "body_bytes": stored}
+
+
+_archive = None
+_archive_lock = Lock()
+
+
+def get_article_archive() -> Optional[ArticleArchive]:
+    """Return the process-wide ArticleArchive, or None when DefaultCFG.archive_enabled is off."""
+    global _archive
+    if not DefaultCFG.archive_enabled:
+        return None
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = ArticleArchive()
+    return _archive
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from config import DefaultCFG
+
+# Settings that change what a generation produces; a change invalidates stored articles
+FINGERPRINT_FIELDS = (
+    "llm_model", "research_mode", "research_results", "research_token_budget",
+    "research_dedupe_threshold", "writing_mode", "search_backend", "stage_models",
+    "fallback_model", "stage_latency_budgets", "article_verification", "link_check_action",
+    "research_index_enabled", "research_index_dim", "research_index_reuse_similarity",
+    "research_index_topic_similarity", "research_index_min_passages", "research_index_top_k",
+    "research_index_max_age",
+)
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Reduce a topic to the form under which identical requests are recognized.
+
+    Applies Unicode compatibility normalization and case folding, trims surrounding
+    quotes and punctuation and collapses whitespace, so "AI agents", " ai  Agents! "
+    and "“AI agents”" are the same topic.
+    """
+    topic = unicodedata.normalize("NFKC", topic).casefold()
+    return re.sub(r"\s+", " ", topic.strip(" \t\n\"'“”‘’.,;:!?")).strip()
+
+
+def pipeline_fingerprint() -> str:
+    """Short hash of the DefaultCFG settings listed in FINGERPRINT_FIELDS."""
+    settings = {name: getattr(DefaultCFG, name, None) for name in FINGERPRINT_FIELDS}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def article_key(topic: str) -> str:
+    """Key of a request: the normalized topic under the current pipeline configuration."""
+    return f"{pipeline_fingerprint()}:{normalize_topic(topic)}"
+
+
+class ArticleStore:
+    """
+    In-memory TTL store of finished articles keyed by `article_key`.
+
+    Bounded to `max_entries`, evicting the least recently used entry first.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = ttl if ttl is not None else DefaultCFG.article_cache_ttl
+        self.max_entries = max_entries or DefaultCFG.article_cache_max_entries
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, article: str):
+        with self._lock:
+            self._entries[key] = (time.time(), article)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_store = None
+_store_lock = Lock()
+
+
+def get_article_store() -> Optional[ArticleStore]:
+    """Return the process-wide ArticleStore, or None when DefaultCFG.article_cache_enabled is off."""
+    global _store
+    if not DefaultCFG.article_cache_enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArticleStore()
+    return _store
@@ -1,4 +1,8 @@
 from crewai import Crew, Task
+from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
 from agents.agents import (
     WritingStyleDecisionAgent,
     ArticleStructureAgent,
@@ -14,44 +18,297 @@ from schemas.agents_schemas import (
     ArticleContent
 )
 
+from config import DefaultCFG
+from core.article_archive import get_article_archive
+from core.checkpoints import CheckpointStore, get_checkpoint_store
+from core.dag import DAGScheduler, Stage, StageFailedError
+from core.events import EventStream, track_tasks
+from core.llm_cache import get_llm_cache
+from core.llm_wrappers import CachedLLM, FallbackLLM, InstrumentedLLM
+from core.metrics import record_run, stage_scope, trace_run
+from core.sections import section_task_description, stitch_sections
+from core.verification import verify_article
+from core.memory_embedder import local_embedder
+from tools.context_compress import compress_research
+from tools.research_index import get_research_index, merge_research
+from tools.web_tools import research_topic
 from utils import filter_article
 
-import os
+import contextvars
+import logging
+import queue
+import time
+import uuid
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("search_scrape", "writing_style", "article_structure", "article_writing")
+
+
+class ArticleGenerationError(RuntimeError):
+    """
+    Raised when a pipeline stage fails for good.
+
+    Attributes:
+        run_id: Id of the run; pass it to ArticleMaker.resume to continue from the checkpoints.
+        stage: Name of the stage that failed.
+    """
+
+    def __init__(self, run_id: str, stage: str, cause: Exception):
+        super().__init__(f"Stage '{stage}' failed: {cause} (resume with run id '{run_id}')")
+        self.run_id = run_id
+        self.stage = stage
+
+
+@dataclass
+class _PipelineSlot:
+    """One warm set of agents bound to its own Crew, used by one `make` call at a time."""
+    agents: dict
+    crew: Crew
+    section_writers: queue.SimpleQueue = field(default_factory=queue.SimpleQueue)
+
 
 class ArticleMaker:
-    def __init__(self, llm):
+    """
+    Runs the four-agent article pipeline.
+
+    The pipeline stays warm between requests: crewai agents keep per-execution state, so
+    each call to `make` checks out a slot (a set of agents bound to a Crew) from an idle
+    pool, building a new one only when none is free, and returns it afterwards. All slots
+    share one set of crew memory backends, created once. Per request, only the four
+    tasks are bound from their templates. This makes `make` cheap to set up and safe to
+    call from many threads at once.
+
+    Each stage talks to the model configured for it in DefaultCFG.stage_models, or to
+    `llm` when none is configured; one client is built per distinct model with
+    `llm_factory`. Stages with a budget in DefaultCFG.stage_latency_budgets race calls
+    that exceed it against DefaultCFG.fallback_model (see FallbackLLM). Stages listed
+    in `cache_stages` talk to the model through a CachedLLM, so repeated requests for
+    those stages are answered from the persistent LLM response cache. Calls that reach
+    the model are timed and their tokens counted (see core/metrics.py).
+
+    Every finished stage is checkpointed under the run's id. A failing stage is retried
+    on its own, and if it still fails, `resume(run_id)` re-runs only the stages that
+    have no checkpoint yet.
+    """
+
+    def __init__(self, llm, cache_stages: Iterable[str] = None, llm_factory: Callable[[str], Any] = None):
+        """
+        Args:
+            llm: The LLM of every stage without a model of its own.
+            cache_stages: Stages whose responses are cached, DefaultCFG.llm_cache_stages by default.
+            llm_factory: Callable building an LLM client for a model name. Without it,
+                DefaultCFG.stage_models and the latency fallback are ignored and every
+                stage uses `llm`.
+        """
         self.llm = llm
-        self.writing_style_agent = WritingStyleDecisionAgent(llm=llm).make_agent()
-        self.article_structure_agent = ArticleStructureAgent(llm=llm).make_agent()
-        self.search_scrape_agent = SearchAndScrapeAgent(llm=llm).make_agent()
-        self.writer_agent = WriterAgent(llm=llm).make_agent()
+        self.llm_factory = llm_factory
+        self._clients = {llm.model: InstrumentedLLM(llm)}
+        cache_stages = DefaultCFG.llm_cache_stages if cache_stages is None else cache_stages
+        self.stage_llms = {stage: self._stage_llm(stage, stage in cache_stages) for stage in STAGES}
+        self._memory = self._build_memory()
+        self._idle_slots = queue.SimpleQueue()
+        self._idle_slots.put(self._build_slot())
+
+    def _client(self, model: str):
+        """Return the instrumented client of `model`, building it on first use."""
+        if model not in self._clients:
+            self._clients[model] = InstrumentedLLM(self.llm_factory(model))
+        return self._clients[model]
+
+    def _stage_llm(self, stage: str, cached: bool):
+        routed = self.llm_factory is not None
+        model = dict(DefaultCFG.stage_models).get(stage) if routed else None
+        llm = self._client(model or self.llm.model)
+        if cached:
+            llm = CachedLLM(llm, get_llm_cache())
+        budget = dict(DefaultCFG.stage_latency_budgets).get(stage)
+        if routed and budget:
+            if DefaultCFG.fallback_model and DefaultCFG.fallback_model != llm.model:
+                llm = FallbackLLM(llm, self._client(DefaultCFG.fallback_model), budget)
+            else:
+                logger.warning("The latency budget of stage '%s' is ignored: %s", stage,
+                               f"it already uses the fallback model {llm.model}" if DefaultCFG.fallback_model
+                               else "no fallback_model is configured")
+        return llm
+
+    @staticmethod
+    def _build_memory() -> dict:
+        """Create the crew memory backends shared by every slot, as Crew keyword arguments."""
+        if not DefaultCFG.crew_memory:
+            return {}
+        if DefaultCFG.embedder_provider == "local":
+            embedder = local_embedder()
+        else:
+            embedder = {
+                "provider": "google-generativeai",
+                "config": {
+                    "api_key": DefaultCFG.api_key,
+                    "model_name": DefaultCFG.embedder_model
+                }
+            }
+        try:
+            return {
+                "memory": True,
+                "embedder": embedder,
+                "short_term_memory": ShortTermMemory(embedder_config=embedder),
+                "long_term_memory": LongTermMemory(),
+                "entity_memory": EntityMemory(embedder_config=embedder),
+            }
+        except Exception as e:
+            logger.warning("Crew memory is disabled, its backend could not be created: %s", e)
+            return {}
+
+    def _build_slot(self) -> _PipelineSlot:
+        agents = {
+            "search_scrape": SearchAndScrapeAgent(llm=self.stage_llms["search_scrape"]).make_agent(),
+            "writing_style": WritingStyleDecisionAgent(llm=self.stage_llms["writing_style"]).make_agent(),
+            "article_structure": ArticleStructureAgent(llm=self.stage_llms["article_structure"]).make_agent(),
+            "article_writing": WriterAgent(llm=self.stage_llms["article_writing"]).make_agent(),
+        }
+        crew = Crew(
+            agents=list(agents.values()),
+            tasks=[],
+            verbose=True,
+            **self._memory
+        )
+        for agent in agents.values():
+            agent.crew = crew  # gives the agents access to the crew's memory
+        return _PipelineSlot(agents=agents, crew=crew)
+
+    def make(self, topic, article_writing_task_description:str = None, events: EventStream = None,
+             sink: Callable[[str], Any] = None, run_id: str = None):
+        """
+        Generate an article for `topic`.
+
+        Args:
+            topic: The subject of the article.
+            article_writing_task_description: Optional override of the writing task prompt.
+            events: Optional EventStream receiving stage progress, structured stage outputs,
+                the writer's Markdown tokens and finally the article.
+            sink: Optional callable receiving the finished article, e.g. a file's `write`.
+            run_id: Id under which stage outputs are checkpointed; stages already
+                checkpointed under this id are not run again. Generated when omitted.
+
+        Returns:
+            str: The filtered Markdown article.
+
+        Raises:
+            ArticleGenerationError: If a stage still fails after its retries.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        checkpoints = get_checkpoint_store()
+        if checkpoints:
+            checkpoints.start(run_id, topic, {"article_writing_task_description": article_writing_task_description})
+
+        try:
+            slot = self._idle_slots.get_nowait()
+        except queue.Empty:
+            slot = self._build_slot()
+        try:
+            content = self._make(topic, slot, article_writing_task_description, events, run_id)
+        finally:
+            self._idle_slots.put(slot)
+
+        if checkpoints:
+            checkpoints.discard(run_id)
+        if sink is not None:
+            sink(content)
+        return content
+
+    def resume(self, run_id: str, events: EventStream = None, sink: Callable[[str], Any] = None) -> str:
+        """
+        Continue a failed run, re-running only the stages without a checkpoint.
+
+        Raises:
+            KeyError: If no checkpoints exist for `run_id`.
+        """
+        checkpoints = get_checkpoint_store()
+        info = checkpoints.run_info(run_id) if checkpoints else None
+        if info is None:
+            raise KeyError(f"No checkpoints for run id '{run_id}'")
+        return self.make(info["topic"], info["options"].get("article_writing_task_description"),
+                         events=events, sink=sink, run_id=run_id)
+
+    def make_record(self, topic: str, run_id: str = None) -> dict:
+        """
+        Generate an article and describe the outcome as a JSON-serializable record.
+
+        Never raises: failures are reported with status "error" and, when the run can be
+        resumed, its `run_id`, so batch runs can continue and retry later.
+
+        Args:
+            topic: The topic to write about.
+            run_id: Id of an earlier failed run of this topic to resume.
+
+        Returns:
+            dict: topic, status, article or error, wall-clock timings and per-stage timings.
+        """
+        events = EventStream()
+        record = {"topic": topic, "started_at": time.time()}
+        try:
+            record["article"] = self.make(topic, events=events, run_id=run_id)
+            record["status"] = "ok"
+        except Exception as e:
+            record["error"] = str(e)
+            record["status"] = "error"
+            if isinstance(e, ArticleGenerationError):
+                record["run_id"] = e.run_id
+        record["finished_at"] = time.time()
+        record["duration"] = record["finished_at"] - record["started_at"]
+        record["stages"] = next((e.data for e in events.events if e.type == "timings"), None)
+        return record
+
+    def make_many(self, topics: Iterable[str], max_workers: int = None, run_ids: dict = None) -> Iterator[dict]:
+        """
+        Generate articles for many topics on a thread pool.
+
+        Wrap the LLM in a RateLimitedLLM before building the ArticleMaker to keep all
+        workers within a provider's requests-per-minute limit.
+
+        Args:
+            topics: The topics to write about.
+            max_workers: Number of concurrent generations, defaults to DefaultCFG.batch_workers.
+            run_ids: Optional mapping of topic to the run id of an earlier failed run to resume.
 
-    def make(self, topic, article_writing_task_description:str = None):
-        
+        Yields:
+            dict: One `make_record` result per topic, in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or DefaultCFG.batch_workers) as executor:
+            run_ids = run_ids or {}
+            futures = [executor.submit(self.make_record, topic, run_ids.get(topic)) for topic in topics]
+            for future in as_completed(futures):
+                yield future.result()
 
+    @staticmethod
+    def _bind_tasks(agents: dict, topic: str, article_writing_task_description: str = None) -> dict:
+        """Build this request's tasks from their templates and fill in the topic."""
         # Define tasks
         search_scrape_task = Task(
             description=(
-                f"Use the keyword '{topic}' to search online and extract content from the top 5 most credible and high-traffic sources, prioritize recent articles or official sites, and summarize key points in each. Ensure you capture diverse perspectives, quotes, and data examples where available."
+                "Use the keyword '{topic}' to search online and extract content from the top 5 most credible and high-traffic sources, prioritize recent articles or official sites, and summarize key points in each. Ensure you capture diverse perspectives, quotes, and data examples where available."
             ),
             expected_output=(
                 "A list of cleaned, structured summaries from the top 5 URLs, each including page title, URL, publication date, author (if available), key quotes or data, and a short paragraph contextualizing its relevance."
             ),
             input_pydantic=None,
             output_pydantic=SearchAndScrapeOutput,
-            agent=self.search_scrape_agent
+            agent=agents["search_scrape"]
         )
 
         writing_style_task = Task(
             description=(
-                f"Analyze the topic '{topic}' and determine the most appropriate writing style for a blog post that reads like a knowledgeable human expert. Consider audience expertise, tone (e.g., witty, authoritative, conversational), structure, and emotional engagement."
+                "Analyze the topic '{topic}' and determine the most appropriate writing style for a blog post that reads like a knowledgeable human expert. Consider audience expertise, tone (e.g., witty, authoritative, conversational), structure, and emotional engagement."
             ),
             expected_output=(
                 "A detailed WritingStyleOutput with fields: style (e.g., 'witty conversational tutorial'), and a reason explaining how it aligns with the topic, audience needs, and desired emotional impact."
             ),
             input_pydantic=WritingStyleInput,
             output_pydantic=WritingStyleOutput,
-            agent=self.writing_style_agent
+            agent=agents["writing_style"]
         )
 
         article_structure_task = Task(
@@ -63,7 +320,7 @@ class ArticleMaker:
             ),
             input_pydantic=ArticleStructureInput,
             output_pydantic=ArticleStructureOutput,
-            agent=self.article_structure_agent,
+            agent=agents["article_structure"],
             context=[writing_style_task, search_scrape_task]
         )
 
@@ -77,40 +334,306 @@ class ArticleMaker:
                 "A fully formatted Markdown article: sections with level-2 headings, subheadings/bullets, `code snippets` as needed, embedded image placeholders with REAL urls, NOT examples urls, and an engaging narrative voice that feels human. Ensure each section meets its specified word count."
             ),
             input_pydantic=ArticleStructureOutput,
-            agent=self.writer_agent,
-            context=[article_structure_task, search_scrape_task],
-            output_file='temp.txt'
+            agent=agents["article_writing"],
+            context=[article_structure_task, search_scrape_task]
         )
 
-        crew = Crew(
-            agents=[
-                self.search_scrape_agent,
-                self.writing_style_agent,
-                self.article_structure_agent,
-                self.writer_agent
-            ],
-            tasks=[
-                search_scrape_task,
-                writing_style_task,
-                article_structure_task,
-                article_writing_task
-            ],
-            verbose=True,
-            memory=True,
-            embedder={
-                "provider": "google",
-                "config": {
-                    "api_key": "<YOUR_API_KEY>",
-                    "model": "text-embedding-004"
-                }
-            }
-        )
+        stages = {
+            "search_scrape": search_scrape_task,
+            "writing_style": writing_style_task,
+            "article_structure": article_structure_task,
+            "article_writing": article_writing_task,
+        }
+        for task in stages.values():
+            task.interpolate_inputs_and_add_conversation_history({"topic": topic})
+        return stages
+
+    def _make(self, topic, slot: _PipelineSlot, article_writing_task_description: str, events: EventStream,
+              run_id: str):
+        stages = self._bind_tasks(slot.agents, topic, article_writing_task_description)
+
+        checkpoints = get_checkpoint_store()
+        restored = {
+            name: CheckpointStore.restore(payload, stages[name].output_pydantic)
+            for name, payload in (checkpoints.load(run_id) if checkpoints else {}).items()
+            if name in stages
+        }
+
+        # search_scrape and writing_style are independent and run side by side
+        graph = [self._stage(name, topic, slot, stages, run_id, restored.get(name), events) for name in stages]
+        if DefaultCFG.article_verification:
+            graph.append(self._verification_stage(events))
+        scheduler = DAGScheduler(graph)
+        with trace_run(run_id, topic) as trace:
+            try:
+                with track_tasks(events, stages, token_stages=("article_writing",)):
+                    outputs = scheduler.run()
+            except StageFailedError as e:
+                record_run(trace, scheduler.report(), "failed")
+                error = ArticleGenerationError(run_id, e.stage, e.__cause__)
+                if events is not None:
+                    events.publish("error", data=str(error))
+                raise error from e.__cause__
+            report = scheduler.report()
+            record_run(trace, report, "ok")
+
+        content = outputs["verify"] if "verify" in outputs else filter_article(outputs["article_writing"].raw)
+        logger.info("Stage timings for '%s': %s", topic, report)
+        self._archive(topic, content, outputs, report, run_id)
+        if events is not None:
+            events.publish("timings", data=report)
+            events.publish("article", data=content)
+        return content
+
+    @staticmethod
+    def _archive(topic: str, content: str, outputs: dict, report: dict, run_id: str):
+        """Store the article with the style, outline, sources and timings of its run, if archiving is on."""
+        archive = get_article_archive()
+        if archive is None:
+            return
+        research, style, structure = (outputs[name].pydantic for name in STAGES[:3])
+        try:
+            archive.save(
+                topic, content, run_id=run_id,
+                style=style.model_dump() if style else None,
+                structure=structure.model_dump() if structure else None,
+                sources=[result.url for result in research.results] if research else [],
+                timings=report
+            )
+        except Exception as e:
+            logger.warning("Archiving the article for '%s' failed: %s", topic, e)
+
+    def _stage(self, name: str, topic: str, slot: _PipelineSlot, stages: dict, run_id: str,
+               restored: TaskOutput = None, events: EventStream = None) -> Stage:
+        """
+        Pick the DAG stage implementation for a pipeline stage according to DefaultCFG.
+
+        LLM calls and fetches made while the stage runs are attributed to it in metrics.
+        """
+        if name == "search_scrape" and DefaultCFG.research_mode == "direct":
+            stage = self._research_stage(topic, stages, run_id, restored, events)
+        elif name == "article_writing" and DefaultCFG.writing_mode == "sections":
+            stage = self._section_stage(topic, slot, stages, run_id, restored, events)
+        else:
+            stage = self._task_stage(name, stages, run_id, restored, events)
+
+        def run(outputs, run=stage.run):
+            with stage_scope(name):
+                return run(outputs)
+
+        stage.run = run
+        return stage
+
+    @staticmethod
+    def _verification_stage(events: EventStream = None) -> Stage:
+        """
+        Build the verify stage, which runs after the writer and returns the final article.
+
+        The filtered article's links and images are checked and dead ones dropped, and
+        section lengths are compared with the outline (see core/verification.py). The
+        report is published as the stage's output. If verification itself fails, the
+        article is used as written.
+        """
+        def run(outputs):
+            content = filter_article(outputs["article_writing"].raw)
+            if events is not None:
+                events.publish("stage_started", "verify")
+            with stage_scope("verify"):
+                try:
+                    content, report = verify_article(content, outputs["article_structure"].pydantic)
+                except Exception as e:
+                    logger.warning("Verifying the article failed, keeping it as written: %s", e)
+                    return content
+            if report.removed:
+                logger.info("Removed %d dead links: %s", len(report.removed), report.removed)
+            if events is not None:
+                events.publish("stage_finished", "verify", report.to_dict())
+            return content
+
+        return Stage(name="verify", run=run, depends_on=("article_writing", "article_structure"))
+
+    @staticmethod
+    def _finish_stage(name: str, output: TaskOutput, run_id: str, events: EventStream = None) -> TaskOutput:
+        """Checkpoint the output of a stage that did not run as a crewai task and announce it."""
+        checkpoints = get_checkpoint_store()
+        if checkpoints:
+            checkpoints.save(run_id, name, output)
+        if events is not None:
+            events.publish("stage_finished", name, output.pydantic.model_dump() if output.pydantic else output.raw)
+        return output
+
+    @staticmethod
+    def _research_stage(topic: str, stages: dict, run_id: str, restored: TaskOutput = None,
+                        events: EventStream = None) -> Stage:
+        """
+        Build the search_scrape stage that searches and scrapes directly in Python.
+
+        When the research index holds enough recent passages of the same topic, they are
+        used and nothing is searched or scraped. Otherwise the topic is researched afresh,
+        recent passages of related topics are added to the scraped pages, and the scraped
+        pages are indexed. The SearchAndScrapeOutput is built without any LLM call, then
+        deduplicated, ranked against the topic and packed into
+        DefaultCFG.research_token_budget before it reaches the downstream tasks. If the
+        search fails or no page yields text, the tool-calling agent task runs instead.
+        """
+        fallback = ArticleMaker._task_stage("search_scrape", stages, run_id, restored, events)
+        task = stages["search_scrape"]
+
+        def run(outputs):
+            if restored is not None:
+                return fallback.run(outputs)
+
+            def use_agent(reason: str):
+                # the stage was already announced; the agent task must not announce it again
+                if events is not None:
+                    events.publish("stage_fallback", "search_scrape", reason)
+                return fallback.run(outputs)
+
+            if events is not None:
+                events.publish("stage_started", "search_scrape")
+            index = get_research_index()
+            research = None
+            if index is not None:
+                research = index.recall(topic, topic_similarity=DefaultCFG.research_index_reuse_similarity)
+            if research is None:
+                related = index.recall(topic) if index is not None else None
+                try:
+                    research = research_topic(topic)
+                except Exception as e:
+                    logger.warning("Direct research for '%s' failed, using the agent: %s", topic, e)
+                    return use_agent(f"direct research failed: {e}")
+                if not research.results:
+                    logger.warning("Direct research for '%s' found no usable pages, using the agent", topic)
+                    return use_agent("direct research found no usable pages")
+                if index is not None:
+                    index.add(research, topic)
+                if related is not None:
+                    research = merge_research(research, related)
+            else:
+                logger.info("Reusing indexed research of the same topic for '%s'", topic)
+
+            research = compress_research(research, topic)
+            output = TaskOutput(
+                description=task.description,
+                expected_output=task.expected_output,
+                raw=research.model_dump_json(),
+                pydantic=research,
+                agent=task.agent.role,
+                output_format=OutputFormat.PYDANTIC
+            )
+            return ArticleMaker._finish_stage("search_scrape", output, run_id, events)
+
+        return Stage(name="search_scrape", run=run, depends_on=fallback.depends_on)
+
+    @staticmethod
+    def _task_stage(name: str, stages: dict, run_id: str, restored: TaskOutput = None,
+                    events: EventStream = None) -> Stage:
+        """
+        Wrap a Task as a DAG stage that runs once the tasks in its `context` have finished.
+
+        A restored checkpoint is returned as is; otherwise the task is executed with up to
+        DefaultCFG.stage_retries extra attempts and its output is checkpointed.
+        """
+        task = stages[name]
+        names = {id(t): n for n, t in stages.items()}
+        depends_on = [names[id(t)] for t in task.context] if isinstance(task.context, list) else []
+
+        def run(outputs):
+            if restored is not None:
+                if events is not None:
+                    events.publish("stage_restored", name, restored.pydantic.model_dump() if restored.pydantic else restored.raw)
+                return restored
+
+            context = aggregate_raw_outputs_from_task_outputs([outputs[d] for d in depends_on])
+            output = ArticleMaker._with_retries(
+                name, lambda: task.execute_sync(agent=task.agent, context=context or None)
+            )
+
+            checkpoints = get_checkpoint_store()
+            if checkpoints:
+                checkpoints.save(run_id, name, output)
+            return output
+
+        return Stage(name=name, run=run, depends_on=depends_on)
+
+    @staticmethod
+    def _with_retries(name: str, call: Callable[[], Any]) -> Any:
+        """Run `call`, retrying it up to DefaultCFG.stage_retries times with a growing backoff."""
+        for attempt in range(DefaultCFG.stage_retries + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == DefaultCFG.stage_retries:
+                    raise
+                logger.warning("Stage '%s' failed (attempt %d), retrying: %s", name, attempt + 1, e)
+                time.sleep(DefaultCFG.stage_retry_backoff * (attempt + 1))
+
+    def _section_stage(self, topic: str, slot: _PipelineSlot, stages: dict, run_id: str,
+                       restored: TaskOutput = None, events: EventStream = None) -> Stage:
+        """
+        Build the article_writing stage that writes each outline section with its own writer call.
+
+        Up to DefaultCFG.section_workers sections are written at once, each by a writer agent
+        checked out from the slot, and the results are stitched back together in outline
+        order. Sections are retried on their own. If the outline has no sections, the
+        whole-article task runs instead.
+        """
+        fallback = self._task_stage("article_writing", stages, run_id, restored, events)
+        task = stages["article_writing"]
+
+        def write_section(structure: ArticleStructureOutput, index: int, research: str) -> str:
+            try:
+                writer = slot.section_writers.get_nowait()
+            except queue.Empty:
+                writer = WriterAgent(llm=self.stage_llms["article_writing"]).make_agent()
+                writer.crew = slot.crew
+            section_task = Task(
+                description=section_task_description(topic, structure, index),
+                expected_output=(
+                    "The Markdown for this one section only, starting with its level-2 heading and meeting its word count."
+                ),
+                agent=writer
+            )
+            try:
+                output = self._with_retries(
+                    f"article_writing[{index}]",
+                    lambda: section_task.execute_sync(agent=writer, context=research or None)
+                )
+            finally:
+                slot.section_writers.put(writer)
+            if events is not None:
+                events.publish("section_finished", "article_writing", {
+                    "index": index, "title": structure.sections[index].title, "total": len(structure.sections)
+                })
+            return output.raw
+
+        def run(outputs):
+            structure = outputs["article_structure"].pydantic
+            if restored is not None or not isinstance(structure, ArticleStructureOutput) or not structure.sections:
+                return fallback.run(outputs)
+
+            if events is not None:
+                events.publish("stage_started", "article_writing")
+            research = aggregate_raw_outputs_from_task_outputs([outputs["search_scrape"]])
+            workers = max(1, min(DefaultCFG.section_workers, len(structure.sections)))
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(contextvars.copy_context().run, write_section, structure, index, research)
+                        for index in range(len(structure.sections))
+                    ]
+                    bodies = [future.result() for future in futures]
+            except Exception as e:
+                if events is not None:
+                    events.publish("stage_failed", "article_writing", str(e))
+                raise
 
-        crew.kickoff(inputs={"topic": topic})
-        
-        with open('./temp.txt', 'r') as file:
-            content = filter_article(file.read())
-        
-        os.remove('./temp.txt')  # Clean up temporary file
+            output = TaskOutput(
+                description=task.description,
+                expected_output=task.expected_output,
+                raw=stitch_sections(topic, structure.sections, bodies),
+                agent=task.agent.role
+            )
+            return self._finish_stage("article_writing", output, run_id, events)
 
-        return content
\ No newline at end of file
+        return Stage(name="article_writing", run=run, depends_on=fallback.depends_on)
@@ -0,0 +1,114 @@
+import json
+import os
+import re
+import shutil
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from crewai.tasks.task_output import TaskOutput
+
+from config import DefaultCFG
+
+
+_RUN_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class CheckpointStore:
+    """
+    Per-run store of finished stage outputs, so a failed generation can resume
+    without paying again for the stages that already succeeded.
+
+    Each run is a directory holding `run.json` (the topic and options it was started
+    with) and one JSON file per finished stage with the TaskOutput, including its
+    validated pydantic output. Files are written atomically.
+
+    Attributes:
+        root: Directory containing one sub-directory per run id.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or DefaultCFG.checkpoint_dir
+        os.makedirs(self.root, exist_ok=True)
+        self.prune(DefaultCFG.checkpoint_ttl)
+
+    def _run_dir(self, run_id: str) -> str:
+        if not _RUN_ID.match(run_id):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        return os.path.join(self.root, run_id)
+
+    @staticmethod
+    def _write(path: str, payload: dict):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(payload, file, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def start(self, run_id: str, topic: str, options: dict = None):
+        """Record the inputs of a run, keeping the original record when resuming."""
+        run_dir = self._run_dir(run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        if not os.path.exists(os.path.join(run_dir, "run.json")):
+            self._write(os.path.join(run_dir, "run.json"),
+                        {"topic": topic, "options": options or {}, "created_at": time.time()})
+
+    def run_info(self, run_id: str) -> Optional[dict]:
+        """Return the topic and options a run was started with, or None for unknown runs."""
+        path = os.path.join(self._run_dir(run_id), "run.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def save(self, run_id: str, stage: str, output: TaskOutput):
+        payload = output.model_dump(mode="json", exclude={"pydantic"})
+        payload["pydantic"] = output.pydantic.model_dump(mode="json") if output.pydantic else None
+        self._write(os.path.join(self._run_dir(run_id), f"{stage}.json"), payload)
+
+    def load(self, run_id: str) -> Dict[str, dict]:
+        """Return the saved payload of every finished stage of a run, keyed by stage name."""
+        run_dir = self._run_dir(run_id)
+        if not os.path.isdir(run_dir):
+            return {}
+        saved = {}
+        for name in os.listdir(run_dir):
+            if name.endswith(".json") and name != "run.json":
+                with open(os.path.join(run_dir, name), "r", encoding="utf-8") as file:
+                    saved[name[:-len(".json")]] = json.load(file)
+        return saved
+
+    @staticmethod
+    def restore(payload: dict, output_model=None) -> TaskOutput:
+        """Rebuild a TaskOutput from a saved payload, re-validating its pydantic output."""
+        pydantic_data = payload.pop("pydantic", None)
+        output = TaskOutput.model_validate(payload)
+        if output_model is not None and pydantic_data is not None:
+            output.pydantic = output_model.model_validate(pydantic_data)
+        return output
+
+    def discard(self, run_id: str):
+        shutil.rmtree(self._run_dir(run_id), ignore_errors=True)
+
+    def prune(self, older_than: float):
+        """Delete runs that were last touched more than `older_than` seconds ago."""
+        cutoff = time.time() - older_than
+        for run_id in os.listdir(self.root):
+            path = os.path.join(self.root, run_id)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+_store = None
+_store_lock = Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Return the process-wide CheckpointStore, or None when checkpointing is disabled."""
+    global _store
+    if not DefaultCFG.checkpoints_enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
@@ -0,0 +1,170 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class StageFailedError(Exception):
+    """Raised by DAGScheduler.run when a stage fails; the original error is the __cause__."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+
+
+@dataclass
+class Stage:
+    """
+    A node of the pipeline graph.
+
+    Attributes:
+        name: Unique stage name.
+        run: Callable receiving a dict of the outputs of `depends_on`, keyed by stage name.
+        depends_on: Names of the stages whose outputs this stage needs.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    depends_on: Sequence[str] = ()
+
+
+@dataclass
+class StageTiming:
+    name: str
+    started_at: float
+    finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+    def to_dict(self) -> dict:
+        return {"stage": self.name, "started_at": self.started_at,
+                "finished_at": self.finished_at, "duration": self.duration}
+
+
+class DAGScheduler:
+    """
+    Runs stages concurrently as soon as all of their dependencies have finished.
+
+    Independent stages overlap instead of waiting on each other, and each stage's
+    start/finish time is recorded so the critical path of a run can be inspected.
+    If a stage raises, no further stages are started; once the stages already running
+    have finished, a StageFailedError is raised for the first failure.
+
+    Attributes:
+        stages: The stages of the graph, keyed by name.
+        outputs: Outputs of finished stages, keyed by name.
+        timings: Timing record of every started stage, keyed by name.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = None):
+        """
+        Initialize the DAGScheduler.
+
+        Args:
+            stages: The stages to run.
+            max_workers: Maximum number of stages running at once, defaults to one per stage.
+
+        Raises:
+            ValueError: If stage names repeat, a dependency is unknown or the graph has a cycle.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique.")
+        for stage in stages:
+            unknown = set(stage.depends_on) - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {sorted(unknown)}")
+        self._check_acyclic()
+
+        self.max_workers = max_workers or len(stages)
+        self.outputs: Dict[str, Any] = {}
+        self.timings: Dict[str, StageTiming] = {}
+
+    def _check_acyclic(self):
+        state = {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Stage graph has a cycle through '{name}'.")
+            state[name] = "visiting"
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            state[name] = "done"
+
+        for name in self.stages:
+            visit(name)
+
+    def _run_stage(self, stage: Stage) -> Any:
+        timing = StageTiming(stage.name, time.time())
+        self.timings[stage.name] = timing
+        try:
+            return stage.run({name: self.outputs[name] for name in stage.depends_on})
+        finally:
+            timing.finished_at = time.time()
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Execute the graph.
+
+        Returns:
+            Dict[str, Any]: The output of every stage, keyed by stage name.
+
+        Raises:
+            StageFailedError: If a stage raised, after every running stage has finished.
+        """
+        pending = dict(self.stages)
+        running = {}
+        failure = None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+        try:
+            while (pending and failure is None) or running:
+                if failure is None:
+                    ready = [s for s in pending.values() if all(d in self.outputs for d in s.depends_on)]
+                    for stage in ready:
+                        del pending[stage.name]
+                        # copy the caller's context so stages see its context variables (e.g. the run trace)
+                        running[executor.submit(contextvars.copy_context().run, self._run_stage, stage)] = stage.name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.outputs[name] = future.result()
+                    except Exception as e:
+                        # siblings keep running until they finish; raising before that would let
+                        # the caller reuse state (e.g. agents) they are still working with
+                        failure = failure or (name, e)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if failure is not None:
+            name, error = failure
+            raise StageFailedError(name, error) from error
+        return self.outputs
+
+    def critical_path(self) -> List[str]:
+        """
+        Return the chain of stages that determined the run's wall time.
+
+        Starting from the stage that finished last, repeatedly steps to the dependency
+        that finished latest, i.e. the one the stage actually waited for.
+        """
+        finished = [t for t in self.timings.values() if t.finished_at is not None]
+        if not finished:
+            return []
+        current = max(finished, key=lambda t: t.finished_at).name
+        path = [current]
+        while self.stages[current].depends_on:
+            current = max(self.stages[current].depends_on, key=lambda d: self.timings[d].finished_at)
+            path.append(current)
+        return path[::-1]
+
+    def report(self) -> dict:
+        """Summarize per-stage timings and the critical path."""
+        return {
+            "stages": [t.to_dict() for t in sorted(self.timings.values(), key=lambda t: t.started_at)],
+            "critical_path": self.critical_path(),
+        }
@@ -0,0 +1,179 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from threading import Condition, Lock
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from utils import filter_article
+
+
+@dataclass
+class PipelineEvent:
+    """
+    A single progress event of an article generation.
+
+    Types: stage_started, stage_finished, stage_failed, stage_restored (a stage answered
+    from its checkpoint), stage_fallback (a running stage switched to its agent task, with
+    the reason as data), section_finished (one outline section written, in "sections"
+    writing mode) (all with `stage` set), token
+    (a chunk of the writer's Markdown), timings (per-stage timings and the critical
+    path), article (the final article) and error.
+    """
+    type: str
+    stage: Optional[str] = None
+    data: Any = None
+    ts: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_sse(self) -> str:
+        """Format the event as a server-sent-events message."""
+        return f"event: {self.type}\ndata: {json.dumps(self.to_dict(), default=str)}\n\n"
+
+
+class EventStream:
+    """
+    Thread-safe, append-only event log for one generation.
+
+    The producer publishes events and finally closes the stream; any number of
+    readers can `follow` it from the start, blocking until new events arrive.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.closed = False
+        self._cond = Condition()
+
+    def publish(self, type: str, stage: str = None, data: Any = None) -> PipelineEvent:
+        event = PipelineEvent(type=type, stage=stage, data=data)
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+        return event
+
+    def last_event(self, stage: str) -> Optional[PipelineEvent]:
+        """Return the latest event published for `stage`, or None."""
+        with self._cond:
+            return next((event for event in reversed(self.events) if event.stage == stage), None)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def follow(self, start: int = 0, timeout: float = None) -> Iterator[Optional[PipelineEvent]]:
+        """
+        Yield events from index `start` until the stream is closed.
+
+        Args:
+            start: Index of the first event to yield.
+            timeout: If set, yield None whenever no event arrived for this many seconds,
+                so callers can send keep-alives.
+        """
+        position = start
+        while True:
+            with self._cond:
+                if position >= len(self.events) and not self.closed:
+                    self._cond.wait(timeout)
+                pending = self.events[position:]
+                closed = self.closed
+            if pending:
+                position += len(pending)
+                yield from pending
+            elif closed:
+                return
+            elif timeout is not None:
+                yield None
+
+
+def markdown_preview(streamed: str) -> str:
+    """Best-effort Markdown view of a partially streamed writer answer."""
+    if "Final Answer:" in streamed:
+        streamed = streamed.split("Final Answer:", 1)[1]
+    return filter_article(streamed)
+
+
+# crewai publishes task and LLM events on a process-wide bus. Tasks are registered here
+# with the stream and stage name they belong to, so concurrent generations only see
+# their own events.
+_routes: Dict[str, Tuple[EventStream, str, bool]] = {}
+_routes_lock = Lock()
+_handlers_installed = False
+
+
+def _route(task_id) -> Optional[Tuple[EventStream, str, bool]]:
+    return _routes.get(str(task_id)) if task_id is not None else None
+
+
+def _on_task_started(source, event):
+    route = _route(getattr(event.task, "id", None))
+    if route:
+        last = route[0].last_event(route[1])
+        # a stage falling back to its task has already announced itself
+        if last is None or last.type not in ("stage_started", "stage_fallback"):
+            route[0].publish("stage_started", route[1])
+
+
+def _on_task_completed(source, event):
+    route = _route(getattr(event.task, "id", None))
+    if route:
+        output = event.output.pydantic.model_dump() if event.output.pydantic else event.output.raw
+        route[0].publish("stage_finished", route[1], output)
+
+
+def _on_task_failed(source, event):
+    route = _route(getattr(event.task, "id", None))
+    if route:
+        route[0].publish("stage_failed", route[1], event.error)
+
+
+def _on_stream_chunk(source, event):
+    route = _route(event.task_id)
+    if route and route[2] and event.chunk and event.tool_call is None:
+        route[0].publish("token", route[1], event.chunk)
+
+
+def _install_handlers():
+    # crewai is imported here rather than at module level, so that importing this module
+    # (e.g. for EventStream in the web frontends) stays cheap
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMStreamChunkEvent
+    from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+
+    global _handlers_installed
+    with _routes_lock:
+        if _handlers_installed:
+            return
+        crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, _on_task_completed)
+        crewai_event_bus.register_handler(TaskFailedEvent, _on_task_failed)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_stream_chunk)
+        _handlers_installed = True
+
+
+@contextmanager
+def track_tasks(stream: Optional[EventStream], stages: dict, token_stages=()):
+    """
+    Forward crewai events of the given tasks to an EventStream while the block runs.
+
+    Args:
+        stream: The stream to publish to; if None, nothing is tracked.
+        stages: Mapping of stage name to Task.
+        token_stages: Stage names whose streamed LLM chunks are published as tokens.
+    """
+    if stream is None:
+        yield None
+        return
+
+    routes = {str(task.id): (stream, name, name in token_stages) for name, task in stages.items()}
+    _install_handlers()
+    with _routes_lock:
+        _routes.update(routes)
+    try:
+        yield stream
+    finally:
+        with _routes_lock:
+            for key in routes:
+                _routes.pop(key, None)
@@ -0,0 +1,177 @@
+import logging
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from config import DefaultCFG
+from core.events import EventStream
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit."""
+
+
+@dataclass
+class Job:
+    id: str
+    topic: str
+    status: str = "queued"  # queued | running | done | failed
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cached: bool = False
+    coalesced: int = 0  # later identical submissions that joined this job
+    key: Optional[str] = field(default=None, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+    events: EventStream = field(default_factory=EventStream, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "cached": self.cached,
+            "coalesced": self.coalesced,
+        }
+
+
+class JobManager:
+    """
+    Runs article generations on a bounded background worker pool.
+
+    Submitting returns immediately with a Job whose status can be polled. At most
+    `max_workers` generations run at once and at most `max_pending` more wait in the
+    queue; beyond that `submit` raises QueueFullError so callers can apply backpressure.
+    Finished jobs are kept for `retention` seconds so their results can be fetched.
+    Each job carries an EventStream with its progress, closed once the job finishes.
+
+    With a `key` function, identical submissions are coalesced: while a job for a key is
+    queued or running, submitting the same key returns that job instead of starting
+    another generation. With a `store`, finished articles are kept under their key and
+    later submissions are answered from it with an already finished job.
+
+    Attributes:
+        run: Callable producing the article for a topic and accepting an `events` keyword,
+            typically ArticleMaker.make.
+        max_workers: Number of generations running concurrently.
+        max_pending: Number of jobs allowed to wait for a worker.
+        retention: Seconds a finished job stays retrievable.
+        key: Optional callable mapping a topic to its deduplication key.
+        store: Optional ArticleStore of finished articles, used together with `key`.
+    """
+
+    def __init__(self, run: Callable[[str], str], max_workers: int = None, max_pending: int = None,
+                 retention: float = None, key: Callable[[str], str] = None, store=None):
+        self.run = run
+        self.max_workers = max_workers or DefaultCFG.job_workers
+        self.max_pending = max_pending if max_pending is not None else DefaultCFG.job_max_pending
+        self.retention = retention or DefaultCFG.job_retention
+        self.key = key
+        self.store = store if key is not None else None
+        self._jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, Job] = {}
+        self._active = 0
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="article-job")
+
+    def submit(self, topic: str) -> Job:
+        """
+        Enqueue a generation for `topic`, or join or answer it without generating.
+
+        Returns:
+            Job: A new job, the queued or running job of an identical earlier submission,
+            or a finished job answered from the store.
+
+        Raises:
+            QueueFullError: If running plus queued jobs already reach the limit.
+        """
+        key = self.key(topic) if self.key else None
+        with self._lock:
+            self._prune()
+            leader = self._inflight.get(key) if key is not None else None
+            if leader is not None:
+                leader.coalesced += 1
+                return leader
+            article = self.store.get(key) if self.store else None
+            if article is not None:
+                return self._cached_job(topic, key, article)
+            if self._active >= self.max_workers + self.max_pending:
+                raise QueueFullError(f"{self._active} jobs already queued or running")
+            job = Job(id=uuid.uuid4().hex, topic=topic, key=key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+            self._active += 1
+        job.future = self._executor.submit(self._execute, job)
+        return job
+
+    def _cached_job(self, topic: str, key: str, article: str) -> Job:
+        now = time.time()
+        job = Job(id=uuid.uuid4().hex, topic=topic, status="done", result=article, started_at=now,
+                  finished_at=now, cached=True, key=key)
+        job.future = Future()
+        job.future.set_result(article)
+        job.events.publish("article", data=article)
+        job.events.close()
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Number of jobs queued or running."""
+        with self._lock:
+            return self._active
+
+    def _execute(self, job: Job) -> Optional[str]:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            result = self.run(job.topic, events=job.events)
+        except Exception as e:
+            job.error = str(e)
+            # finished_at is set before the status, so a finished job always has it
+            job.finished_at = time.time()
+            job.status = "failed"
+        else:
+            job.result = result
+            job.finished_at = time.time()
+            job.status = "done"
+            if self.store:
+                try:
+                    self.store.put(job.key, result)
+                except Exception as e:
+                    logger.warning("Caching the article for '%s' failed: %s", job.topic, e)
+        finally:
+            with self._lock:
+                self._active -= 1
+                if job.key is not None and self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+            job.events.close()
+        return job.result
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values()
+                       if j.finished and j.finished_at is not None and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
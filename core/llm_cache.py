@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Optional
+
+from config import DefaultCFG
+
+
+class LLMCache:
+    """
+    Persistent SQLite store of LLM responses keyed by a hash of the full request.
+
+    Entries older than `ttl` are ignored and deleted lazily; once the stored responses
+    exceed `max_bytes`, the least recently used entries are evicted.
+
+    Attributes:
+        ttl: Seconds a response stays valid.
+        max_bytes: Size cap for the stored responses.
+        hits: Lookups answered from the store.
+        misses: Lookups that had to call the model.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, max_bytes: int = None):
+        self.path = path or DefaultCFG.llm_cache_path
+        self.ttl = ttl if ttl is not None else DefaultCFG.llm_cache_ttl
+        self.max_bytes = max_bytes or DefaultCFG.llm_cache_max_bytes
+        self.hits = self.misses = 0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, messages, tools=None, schema: Optional[dict] = None, stop=None) -> str:
+        """Hash everything that determines a response into a cache key."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "tools": tools, "schema": schema, "stop": sorted(stop or [])},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, now, now, len(response.encode("utf-8"))),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                doomed = []
+                for old_key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((old_key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_cache = None
+_cache_lock = Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide LLMCache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
@@ -0,0 +1,223 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from crewai.llms.base_llm import BaseLLM
+
+from core.metrics import record_llm_call, record_llm_fallback
+from tools.context_compress import estimate_tokens
+
+
+class LLMWrapper(BaseLLM):
+    """
+    Base class for LLM decorators.
+
+    Forwards every call and attribute to the wrapped LLM, including `stop`, which the
+    agent executor sets on the LLM it is given. Subclasses override `call` to add
+    behavior around the inner call.
+
+    Attributes:
+        llm: The wrapped LLM instance.
+    """
+
+    def __init__(self, llm: BaseLLM):
+        self.llm = llm
+
+    def __getattr__(self, name):
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    @property
+    def model(self):
+        return self.llm.model
+
+    @property
+    def temperature(self):
+        return self.llm.temperature
+
+    @property
+    def stop(self):
+        return self.llm.stop
+
+    @stop.setter
+    def stop(self, value):
+        self.llm.stop = value
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        return self.llm.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+
+class RateLimiter:
+    """
+    Thread-safe sliding-window limiter allowing at most `rpm` acquisitions per minute.
+    """
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until another call fits into the last minute's budget."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 60:
+                    self._calls.popleft()
+                if len(self._calls) < self.rpm:
+                    self._calls.append(now)
+                    return
+                wait_for = 60 - (now - self._calls[0])
+            time.sleep(wait_for)
+
+
+class RateLimitedLLM(LLMWrapper):
+    """
+    LLM decorator sharing one requests-per-minute budget across every agent and thread
+    that uses it, so concurrent generations stay within the provider's rate limit.
+    """
+
+    def __init__(self, llm: BaseLLM, rpm: int):
+        super().__init__(llm)
+        self.limiter = RateLimiter(rpm)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.limiter.acquire()
+        return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+
+class CachedLLM(LLMWrapper):
+    """
+    LLM decorator answering repeated requests from an LLMCache.
+
+    The cache key covers the model, messages, tool schemas, stop words and the output
+    schema of the calling task. Calls that let the model execute functions directly
+    are never cached.
+    """
+
+    def __init__(self, llm: BaseLLM, cache):
+        super().__init__(llm)
+        self.cache = cache
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        if available_functions:
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        output_model = getattr(from_task, "output_pydantic", None)
+        schema = output_model.model_json_schema() if output_model else None
+        key = self.cache.key(self.model, messages, tools, schema, self.stop)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(response, str) and response.strip():
+            self.cache.put(key, self.model, response)
+        return response
+
+
+class InstrumentedLLM(LLMWrapper):
+    """
+    LLM decorator recording the latency and token usage of every call in core.metrics.
+
+    Token counts come from the usage tracker crewai passes in `callbacks`. When no usage
+    has been reported by the time the call returns, they are estimated from the text length.
+    """
+
+    @staticmethod
+    def _token_process(callbacks):
+        for callback in callbacks or ():
+            process = getattr(callback, "token_cost_process", None)
+            if process is not None:
+                return process
+        return None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        process = self._token_process(callbacks)
+        before = (process.prompt_tokens, process.completion_tokens) if process else (0, 0)
+        started = time.perf_counter()
+        try:
+            response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        except Exception:
+            record_llm_call(self.model, time.perf_counter() - started, 0, 0, ok=False)
+            raise
+        seconds = time.perf_counter() - started
+
+        prompt_tokens, completion_tokens = (
+            (process.prompt_tokens - before[0], process.completion_tokens - before[1]) if process else (0, 0)
+        )
+        if not prompt_tokens:
+            text = messages if isinstance(messages, str) else "".join(str(m.get("content", "")) for m in messages)
+            prompt_tokens = estimate_tokens(text)
+        if not completion_tokens:
+            completion_tokens = estimate_tokens(response if isinstance(response, str) else str(response))
+        record_llm_call(self.model, seconds, prompt_tokens, completion_tokens)
+        return response
+
+
+class FallbackLLM(LLMWrapper):
+    """
+    LLM decorator racing calls that exceed a latency budget against a faster model.
+
+    Each call runs on a worker thread. If the wrapped LLM has not answered after `budget`
+    seconds, the same request is also sent to `fallback`, and whichever answers first is
+    returned; if one of them fails, the other's answer is used. The slower call cannot be
+    cancelled, it finishes in the background and its answer is dropped.
+
+    Attributes:
+        fallback: The LLM used when the wrapped one is too slow.
+        budget: Seconds to wait for the wrapped LLM alone.
+    """
+
+    def __init__(self, llm: BaseLLM, fallback: BaseLLM, budget: float):
+        super().__init__(llm)
+        self.fallback = fallback
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(thread_name_prefix="llm-fallback")
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        def run(llm):
+            return self._executor.submit(
+                contextvars.copy_context().run, llm.call,
+                messages, tools, callbacks, available_functions, from_task, from_agent
+            )
+
+        primary = run(self.llm)
+        done, _ = wait([primary], timeout=self.budget)
+        if done:
+            return primary.result()
+
+        self.fallback.stop = self.stop
+        racing = {primary: "primary", run(self.fallback): "fallback"}
+        error = None
+        while racing:
+            done, _ = wait(racing, return_when=FIRST_COMPLETED)
+            for future in done:
+                winner = racing.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                record_llm_fallback(winner)
+                return response
+        raise error
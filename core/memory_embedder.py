@@ -0,0 +1,36 @@
+from chromadb.api.types import EmbeddingFunction
+from crewai.rag.embeddings.providers.custom.embedding_callable import CustomEmbeddingFunction
+
+from config import DefaultCFG
+from tools.research_index import hash_embed
+
+
+class HashingEmbeddingFunction(CustomEmbeddingFunction, EmbeddingFunction):
+    """
+    Embedding function for crew memory built on `tools.research_index.hash_embed`.
+
+    Embeds on the CPU without a model download or network call, so memory reads and
+    writes cost microseconds instead of an embedding API round trip.
+    """
+
+    def __init__(self, dim: int = None, **kwargs):
+        self.dim = dim or DefaultCFG.research_index_dim
+
+    def __call__(self, input):
+        return list(hash_embed(list(input), self.dim))
+
+    @staticmethod
+    def name() -> str:
+        return "articlewriter-hashing"
+
+    def get_config(self) -> dict:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(**config)
+
+
+def local_embedder() -> dict:
+    """crewai embedder specification using HashingEmbeddingFunction."""
+    return {"provider": "custom", "config": {"embedding_callable": HashingEmbeddingFunction}}
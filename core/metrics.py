@@ -0,0 +1,297 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import DefaultCFG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Dict[str, str] = None) -> str:
+        pairs = list(zip(self.label_names, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self.samples()])
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label combination."""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, value: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(k)} {v}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * len(self.buckets) + [0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, counts in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': str(bound)})} {count}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {counts[-2]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {counts[-2]}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {counts[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value per label combination, read from a callback when metrics are rendered."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str], read: Callable[[], Dict[tuple, float]]):
+        super().__init__(name, help, label_names)
+        self.read = read
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(tuple(map(str, k)))} {v}" for k, v in sorted(self.read().items())]
+
+
+# Where each cache's process-wide instance lives: (name, module, attribute path)
+_CACHES = (
+    ("page", "tools.page_cache", "_cache"),
+    ("search", "tools.search_backends", "_search_cache"),
+    ("llm", "core.llm_cache", "_cache"),
+    ("article", "core.article_cache", "_store"),
+    ("research_index", "tools.research_index", "_index"),
+    ("link", "tools.link_check", "_checker.cache"),
+)
+
+
+def _cache_stats() -> Dict[str, dict]:
+    """Stats of the caches created so far; rendering metrics never creates a cache or its files."""
+    stats = {}
+    for name, module, path in _CACHES:
+        cache = sys.modules.get(module)
+        for attribute in path.split("."):
+            cache = getattr(cache, attribute, None)
+        if cache is not None:
+            stats[name] = cache.stats()
+    return stats
+
+
+RUNS = Counter("article_runs_total", "Article generations by outcome.", ("status",))
+RUN_SECONDS = Histogram("article_run_seconds", "Wall time of article generations.",
+                        buckets=(5, 10, 30, 60, 120, 180, 300, 600, 1200))
+STAGE_SECONDS = Histogram("article_stage_seconds", "Wall time of pipeline stages.", ("stage",))
+LLM_CALLS = Counter("llm_calls_total", "LLM calls by stage, model and outcome.", ("stage", "model", "status"))
+LLM_SECONDS = Histogram("llm_call_seconds", "Latency of LLM calls.", ("stage", "model"))
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by stage, model and kind (prompt or completion).",
+                     ("stage", "model", "kind"))
+LLM_FALLBACKS = Counter("llm_fallbacks_total",
+                        "LLM calls raced against the fallback model by stage and the model that answered first.",
+                        ("stage", "winner"))
+FETCHES = Counter("http_fetches_total", "HTTP fetches by kind (page, search or link) and status.", ("kind", "status"))
+FETCH_SECONDS = Histogram("http_fetch_seconds", "Latency of HTTP fetches.", ("kind",))
+FETCH_BYTES = Counter("http_fetch_bytes_total", "Response bytes read by HTTP fetches.", ("kind",))
+CACHE_LOOKUPS = Gauge(
+    "cache_lookups", "Cache lookups since start by cache and result.", ("cache", "result"),
+    lambda: {(name, result): s[key] for name, s in _cache_stats().items()
+             for result, key in (("hit", "hits"), ("miss", "misses"))}
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio", "Share of cache lookups answered from the cache.", ("cache",),
+    lambda: {(name,): s["hit_rate"] for name, s in _cache_stats().items()}
+)
+
+def _open_circuits() -> Dict[tuple, float]:
+    from tools.circuit_breaker import get_domain_breakers
+    return {(domain,): 1 for domain, health in get_domain_breakers().stats().items() if health["open"]}
+
+
+OPEN_CIRCUITS = Gauge(
+    "domain_circuit_open", "Domains currently skipped by the page fetch circuit breakers.", ("domain",),
+    _open_circuits
+)
+
+REGISTRY = (RUNS, RUN_SECONDS, STAGE_SECONDS, LLM_CALLS, LLM_SECONDS, LLM_TOKENS, LLM_FALLBACKS,
+            FETCHES, FETCH_SECONDS, FETCH_BYTES, CACHE_LOOKUPS, CACHE_HIT_RATIO, OPEN_CIRCUITS)
+
+
+def render_metrics() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+@dataclass
+class RunTrace:
+    """
+    Everything recorded while one article was generated.
+
+    Attributes:
+        run_id: The run the trace belongs to.
+        topic: The topic of the run.
+        llm_calls: One entry per LLM call, with stage, model, latency and token counts.
+        fetches: One entry per HTTP fetch, with kind, URL, status, latency and bytes.
+    """
+    run_id: str
+    topic: str
+    started_at: float = field(default_factory=time.time)
+    llm_calls: List[dict] = field(default_factory=list)
+    fetches: List[dict] = field(default_factory=list)
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def add(self, kind: str, entry: dict):
+        with self._lock:
+            getattr(self, kind).append(entry)
+
+    def to_dict(self, timings: dict = None, status: str = None) -> dict:
+        with self._lock:
+            llm_calls, fetches = list(self.llm_calls), list(self.fetches)
+        return {
+            "run_id": self.run_id,
+            "topic": self.topic,
+            "status": status,
+            "started_at": self.started_at,
+            "duration": time.time() - self.started_at,
+            "timings": timings,
+            "llm": {
+                "calls": len(llm_calls),
+                "seconds": sum(c["seconds"] for c in llm_calls),
+                "prompt_tokens": sum(c["prompt_tokens"] for c in llm_calls),
+                "completion_tokens": sum(c["completion_tokens"] for c in llm_calls),
+            },
+            "llm_calls": llm_calls,
+            "fetches": fetches,
+            "caches": _cache_stats(),
+        }
+
+
+# The trace and stage of the code running now. DAGScheduler, FetchEngine and the section
+# writers copy the context into their worker threads, so nested work is attributed too.
+_current_trace: ContextVar[Optional[RunTrace]] = ContextVar("current_trace", default=None)
+_current_stage: ContextVar[Optional[str]] = ContextVar("current_stage", default=None)
+
+
+@contextmanager
+def trace_run(run_id: str, topic: str):
+    """Collect the LLM calls and fetches of the enclosed run into a RunTrace."""
+    trace = RunTrace(run_id, topic)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def stage_scope(stage: str):
+    """Attribute LLM calls made in the enclosed block to a pipeline stage."""
+    token = _current_stage.set(stage)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def record_llm_call(model: str, seconds: float, prompt_tokens: int, completion_tokens: int, ok: bool = True):
+    stage = _current_stage.get() or "unknown"
+    LLM_CALLS.inc(stage=stage, model=model, status="ok" if ok else "error")
+    LLM_SECONDS.observe(seconds, stage=stage, model=model)
+    LLM_TOKENS.inc(prompt_tokens, stage=stage, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, stage=stage, model=model, kind="completion")
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add("llm_calls", {"stage": stage, "model": model, "ok": ok, "seconds": seconds,
+                                "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens})
+
+
+def record_llm_fallback(winner: str):
+    """Record that a slow LLM call was raced against the fallback model; `winner` is "primary" or "fallback"."""
+    stage = _current_stage.get() or "unknown"
+    LLM_FALLBACKS.inc(stage=stage, winner=winner)
+
+
+def record_fetch(kind: str, url: str, status, seconds: float, nbytes: int = 0):
+    """Record an HTTP fetch; `status` is the response code, "cached" or "error"."""
+    FETCHES.inc(kind=kind, status=status)
+    FETCH_SECONDS.observe(seconds, kind=kind)
+    FETCH_BYTES.inc(nbytes, kind=kind)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add("fetches", {"kind": kind, "url": url, "status": status, "seconds": seconds, "bytes": nbytes,
+                              "stage": _current_stage.get()})
+
+
+def record_run(trace: RunTrace, timings: dict, status: str):
+    """
+    Record the outcome and stage timings of a run and write its JSON trace if enabled.
+
+    Args:
+        trace: The run's trace.
+        timings: The DAGScheduler report of the run.
+        status: "ok" or "failed".
+    """
+    RUNS.inc(status=status)
+    RUN_SECONDS.observe(time.time() - trace.started_at)
+    for timing in timings.get("stages", []):
+        if timing.get("duration") is not None:
+            STAGE_SECONDS.observe(timing["duration"], stage=timing["stage"])
+    if DefaultCFG.trace_dir:
+        path = os.path.join(DefaultCFG.trace_dir, f"{trace.run_id}.json")
+        try:
+            os.makedirs(DefaultCFG.trace_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(trace.to_dict(timings, status), file, indent=2, default=str)
+        except (OSError, TypeError, ValueError) as e:
+            # the trace is diagnostics only; losing it must not fail the run
+            logger.warning("Writing the run trace to %s failed: %s", path, e)
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from config import DefaultCFG
+
+logger = logging.getLogger(__name__)
+
+
+def build_llm(model: str = None):
+    """Build the crewai LLM client of `model`, DefaultCFG.llm_model by default."""
+    from crewai import LLM
+
+    return LLM(
+        model=model or DefaultCFG.llm_model,
+        api_key=DefaultCFG.api_key,
+        stream=DefaultCFG.llm_stream
+    )
+
+
+def build_maker():
+    """
+    Build the LLM clients and the ArticleMaker from DefaultCFG.
+
+    crewai and the pipeline are imported here, so modules that only hold a LazyPipeline
+    import quickly.
+    """
+    from core.article_manger import ArticleMaker
+
+    return ArticleMaker(build_llm(), llm_factory=build_llm)
+
+
+class LazyPipeline:
+    """
+    Builds the heavy pipeline object on first use, or ahead of time in a warm-up thread.
+
+    Lets servers start answering (static pages, health checks) before crewai is imported
+    and the agents are built. `get` blocks until the object exists, building it in the
+    calling thread if no warm-up is running.
+
+    Args:
+        factory: Callable building the object, `build_maker` by default.
+    """
+
+    def __init__(self, factory: Callable[[], Any] = None):
+        self.factory = factory or build_maker
+        self._value = None
+        self._error: Optional[BaseException] = None
+        self._started_at = None
+        self._ready_after = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _build(self):
+        with self._lock:
+            if self._done.is_set() or self._started_at is not None:
+                return
+            self._started_at = time.time()
+        try:
+            self._value = self.factory()
+        except BaseException as e:
+            logger.exception("Building the pipeline failed")
+            self._error = e
+        self._ready_after = time.time() - self._started_at
+        self._done.set()
+
+    def warm_up(self) -> threading.Thread:
+        """Start building in a daemon thread and return it."""
+        thread = threading.Thread(target=self._build, name="pipeline-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, timeout: float = None):
+        """
+        Return the built object, building it first if needed.
+
+        Raises:
+            TimeoutError: If it is not ready within `timeout` seconds.
+            Exception: Whatever the factory raised.
+        """
+        if not self._done.is_set():
+            self._build()
+            if not self._done.wait(timeout):
+                raise TimeoutError("The pipeline is still starting up")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self._error is None
+
+    def status(self) -> dict:
+        """Describe the build state: "cold", "warming", "ready" or "failed"."""
+        if not self._done.is_set():
+            state = "cold" if self._started_at is None else "warming"
+        else:
+            state = "failed" if self._error is not None else "ready"
+        return {
+            "status": state,
+            "build_seconds": self._ready_after,
+            "error": str(self._error) if self._error is not None else None,
+        }
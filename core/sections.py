@@ -0,0 +1,89 @@
+import re
+from typing import List
+
+from schemas.agents_schemas import ArticleSection, ArticleStructureOutput
+from utils import filter_article
+
+_HEADING = re.compile(r"^\s*#{1,6}\s+(.*?)\s*#*\s*$")
+
+
+def section_brief(section: ArticleSection) -> str:
+    """One-line summary of a section, used to tell a writer what its neighbours cover."""
+    brief = f"'{section.title}'"
+    if section.subsections:
+        brief += " (covers: " + "; ".join(section.subsections) + ")"
+    return brief
+
+
+def section_task_description(topic: str, structure: ArticleStructureOutput, index: int) -> str:
+    """
+    Build the writer prompt for one section of the outline.
+
+    The writer gets the shared tone and writing tips, the full spec of its own section and
+    a compact summary of the sections around it, so that the separately written sections
+    read as one article without repeating each other.
+
+    Args:
+        topic: The topic of the article.
+        structure: The article outline.
+        index: Position of the section to write in `structure.sections`.
+
+    Returns:
+        str: The task description.
+    """
+    sections = structure.sections
+    section = sections[index]
+    lines = [
+        f"You are writing section {index + 1} of {len(sections)} of a blog article about '{topic}'. "
+        f"Write ONLY this section in markdown, starting with the level-2 heading '## {section.title}'. "
+        "Do not write an introduction or conclusion for the whole article unless this section is one.",
+        "",
+        f"Tone: {structure.tone}",
+        "Writing tips:",
+        *[f"- {tip}" for tip in structure.writing_tips],
+        "",
+        f"Section title: {section.title}",
+        f"Length: {section.length}",
+    ]
+    if section.subsections:
+        lines.append("Subsections: " + "; ".join(section.subsections))
+    if section.code_examples:
+        lines.append(f"Code examples: {section.code_examples}")
+    if section.code_explanations:
+        lines.append(f"Code explanations: {section.code_explanations}")
+    lines.append("")
+    if index > 0:
+        lines.append("The previous section is " + section_brief(sections[index - 1]) + ".")
+    if index + 1 < len(sections):
+        lines.append("The next section is " + section_brief(sections[index + 1]) + ".")
+    lines.append("Include image links with REAL urls only, and use the scraped content for facts and examples.")
+    return "\n".join(lines)
+
+
+def stitch_sections(topic: str, sections: List[ArticleSection], bodies: List[str]) -> str:
+    """
+    Join separately written sections into one Markdown article, in outline order.
+
+    Each body is cleaned with `filter_article`; its leading heading, whatever its level, is
+    replaced by a level-2 heading with the outline title so that the result is the same
+    no matter how each writer formatted its heading.
+
+    Args:
+        topic: The topic of the article, used as its title.
+        sections: The outline sections.
+        bodies: The written Markdown for each section, in the same order.
+
+    Returns:
+        str: The stitched article.
+    """
+    parts = [f"# {topic.strip()}"]
+    for section, body in zip(sections, bodies):
+        lines = filter_article(body).splitlines()
+        # filter_article drops an opening ```markdown fence but not its closing one
+        fences = sum(1 for line in lines if line.strip().startswith("```"))
+        if fences % 2 and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        if lines and _HEADING.match(lines[0]):
+            lines = lines[1:]
+        parts.append(f"## {section.title}\n\n" + "\n".join(lines).strip())
+    return "\n\n".join(parts)
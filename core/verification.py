@@ -0,0 +1,183 @@
+import re
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from config import DefaultCFG
+from schemas.agents_schemas import ArticleStructureOutput
+from tools.link_check import LinkChecker, get_link_checker
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_HEADING = re.compile(r"^\s*(#{1,6})\s+(.*?)\s*#*\s*$")
+# [text](url "title") and ![alt](url), with the URL optionally in angle brackets; the URL
+# may contain balanced parentheses, as in Wikipedia's .../Python_(programming_language)
+_LINK = re.compile(r"(!?)\[([^\]]*)\]\(\s*<?((?:[^()\s<>]|\([^()\s<>]*\))+)>?(?:\s+\"[^\"]*\")?\s*\)")
+_WORD = re.compile(r"[\w'’-]+")
+_NUMBER = re.compile(r"\d[\d,]*")
+
+
+@dataclass
+class MarkdownLink:
+    """A link or image found in the article, located by line and character span."""
+    line: int
+    start: int
+    end: int
+    text: str
+    url: str
+    image: bool
+
+
+@dataclass
+class MarkdownSection:
+    """A level-2 section of the article and its prose word count (code blocks excluded)."""
+    title: str
+    words: int = 0
+
+
+@dataclass
+class ParsedMarkdown:
+    lines: List[str]
+    links: List[MarkdownLink] = field(default_factory=list)
+    sections: List[MarkdownSection] = field(default_factory=list)
+
+
+def parse_markdown(markdown: str) -> ParsedMarkdown:
+    """
+    Collect the links, images and level-2 sections of an article in one pass.
+
+    Fenced code blocks are skipped. Words before the first level-2 heading belong to
+    an untitled leading section; deeper headings belong to the section they are in.
+
+    Examples:
+        >>> link = parse_markdown("See [Python](https://en.wikipedia.org/wiki/Python_(language)) now.").links[0]
+        >>> link.url, link.text
+        ('https://en.wikipedia.org/wiki/Python_(language)', 'Python')
+        >>> [l.url for l in parse_markdown('![a](<https://x.org/a.png> "t") and [b](https://x.org/b)').links]
+        ['https://x.org/a.png', 'https://x.org/b']
+    """
+    parsed = ParsedMarkdown(lines=markdown.split("\n"))
+    section = MarkdownSection(title="")
+    in_fence = False
+    for number, line in enumerate(parsed.lines):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        heading = _HEADING.match(line)
+        if heading and len(heading.group(1)) == 2:
+            if section.title or section.words:
+                parsed.sections.append(section)
+            section = MarkdownSection(title=heading.group(2))
+            continue
+        for match in _LINK.finditer(line):
+            parsed.links.append(MarkdownLink(number, match.start(), match.end(), match.group(2),
+                                             match.group(3), image=bool(match.group(1))))
+        prose = _LINK.sub(lambda m: "" if m.group(1) else m.group(2), line)
+        if not heading:
+            section.words += len(_WORD.findall(prose))
+    if section.title or section.words:
+        parsed.sections.append(section)
+    return parsed
+
+
+def parse_length(length: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Read the word range out of an ArticleSection.length such as "at least 500 words".
+
+    Two numbers are a range, one number is a minimum unless it is introduced as an upper
+    bound ("up to", "at most", "under", "no more than", "max").
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: The minimum and maximum word counts, None where unbounded.
+    """
+    numbers = [int(n.replace(",", "")) for n in _NUMBER.findall(length or "")]
+    if not numbers:
+        return None, None
+    if len(numbers) >= 2:
+        return min(numbers[:2]), max(numbers[:2])
+    if re.search(r"\b(up to|at most|under|no more than|max(imum)?|less than)\b", length, re.IGNORECASE):
+        return None, numbers[0]
+    return numbers[0], None
+
+
+@dataclass
+class VerificationReport:
+    """
+    Outcome of verifying an article.
+
+    Attributes:
+        links: Per checked URL: its text, whether it is an image, and `ok` (True, False
+            for dead, None for undecided) with the HTTP status.
+        removed: URLs of dead links and images taken out of the article.
+        sections: Per written section: title, word count, the outline's length target
+            and whether the count meets it (None without a readable target).
+        seconds: Time spent verifying.
+    """
+    links: List[dict] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    sections: List[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {"links": self.links, "removed": self.removed, "sections": self.sections, "seconds": self.seconds}
+
+
+def _section_report(parsed: ParsedMarkdown, structure: Optional[ArticleStructureOutput]) -> List[dict]:
+    outline = {section.title.strip().lower(): section for section in (structure.sections if structure else [])}
+    report = []
+    for section in parsed.sections:
+        spec = outline.get(section.title.strip().lower())
+        minimum, maximum = parse_length(spec.length) if spec else (None, None)
+        meets = None
+        if minimum is not None or maximum is not None:
+            meets = (minimum is None or section.words >= minimum) and (maximum is None or section.words <= maximum)
+        report.append({"title": section.title, "words": section.words,
+                       "target": spec.length if spec else None, "meets_target": meets})
+    return report
+
+
+def verify_article(markdown: str, structure: ArticleStructureOutput = None, checker: LinkChecker = None,
+                   action: str = None) -> Tuple[str, VerificationReport]:
+    """
+    Check every http(s) link and image of an article and compare section lengths with the outline.
+
+    The Markdown is parsed once. All URLs are checked concurrently (see LinkChecker);
+    with action "drop", dead links are turned into their plain text and dead images are
+    removed, while undecided ones are left alone. With action "report" the article is
+    returned unchanged.
+
+    Args:
+        markdown: The article.
+        structure: The outline the article was written from, for the length targets.
+        checker: The LinkChecker to use, the process-wide one by default.
+        action: "drop" or "report", defaults to DefaultCFG.link_check_action.
+
+    Returns:
+        Tuple[str, VerificationReport]: The (possibly edited) article and the report.
+    """
+    started = time.perf_counter()
+    action = action or DefaultCFG.link_check_action
+    parsed = parse_markdown(markdown)
+    links = [link for link in parsed.links if link.url.startswith(("http://", "https://"))]
+    statuses = (checker or get_link_checker()).check(link.url for link in links) if links else {}
+
+    report = VerificationReport(sections=_section_report(parsed, structure))
+    first = {}
+    for link in links:
+        first.setdefault(link.url, link)
+    for url, status in statuses.items():
+        report.links.append({"url": url, "text": first[url].text, "image": first[url].image, "ok": status.ok,
+                             "status": status.status})
+
+    dead = [link for link in links if statuses[link.url].ok is False]
+    if action == "drop" and dead:
+        lines = parsed.lines
+        for link in sorted(dead, key=lambda link: (link.line, link.start), reverse=True):
+            line = lines[link.line]
+            lines[link.line] = line[:link.start] + ("" if link.image else link.text) + line[link.end:]
+        report.removed = list(dict.fromkeys(link.url for link in dead))
+        markdown = "\n".join(lines)
+
+    report.seconds = time.perf_counter() - started
+    return markdown, report
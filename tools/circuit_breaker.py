@@ -0,0 +1,103 @@
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from config import DefaultCFG
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching from a domain whose circuit is open."""
+
+
+def domain_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+@dataclass
+class DomainHealth:
+    """Failure and latency record of one domain."""
+    failures: int = 0                # consecutive failures
+    successes: int = 0
+    total_failures: int = 0
+    avg_seconds: Optional[float] = None  # exponentially weighted fetch latency
+    opened_at: Optional[float] = None    # set while the circuit is open or half-open
+    trial_running: bool = False          # a half-open trial fetch is in flight
+
+    def to_dict(self) -> dict:
+        return {"failures": self.failures, "successes": self.successes, "total_failures": self.total_failures,
+                "avg_seconds": self.avg_seconds, "open": self.opened_at is not None}
+
+
+class DomainBreakers:
+    """
+    Per-domain circuit breakers for page fetches.
+
+    A fetch that fails, or succeeds but takes longer than `slow_seconds`, counts as a
+    failure. After `threshold` consecutive failures, the domain's circuit opens and its
+    URLs are skipped. Once `cooldown` seconds have passed, one trial fetch is let through
+    (half-open): success closes the circuit and failure opens it for another cooldown.
+    """
+
+    def __init__(self, threshold: int = None, cooldown: float = None, slow_seconds: float = None):
+        self.threshold = threshold or DefaultCFG.breaker_failures
+        self.cooldown = cooldown if cooldown is not None else DefaultCFG.breaker_cooldown
+        self.slow_seconds = slow_seconds or DefaultCFG.breaker_slow_seconds
+        self._domains: Dict[str, DomainHealth] = {}
+        self._lock = Lock()
+
+    def allow(self, url: str) -> bool:
+        """Return whether a fetch of `url` may go ahead, claiming the trial fetch of a half-open circuit."""
+        with self._lock:
+            health = self._domains.get(domain_of(url))
+            if health is None or health.opened_at is None:
+                return True
+            if health.trial_running or time.time() - health.opened_at < self.cooldown:
+                return False
+            health.trial_running = True
+            return True
+
+    def is_open(self, url: str) -> bool:
+        """Like `allow`, but without claiming a trial fetch."""
+        with self._lock:
+            health = self._domains.get(domain_of(url))
+            return bool(health and health.opened_at is not None
+                        and (health.trial_running or time.time() - health.opened_at < self.cooldown))
+
+    def record(self, url: str, ok: bool, seconds: float = None):
+        """Record the outcome of a fetch of `url`."""
+        if seconds is not None and seconds > self.slow_seconds:
+            ok = False
+        with self._lock:
+            health = self._domains.setdefault(domain_of(url), DomainHealth())
+            if seconds is not None:
+                health.avg_seconds = seconds if health.avg_seconds is None else 0.8 * health.avg_seconds + 0.2 * seconds
+            health.trial_running = False
+            if ok:
+                health.successes += 1
+                health.failures = 0
+                health.opened_at = None
+            else:
+                health.total_failures += 1
+                health.failures += 1
+                if health.opened_at is not None or health.failures >= self.threshold:
+                    health.opened_at = time.time()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {domain: health.to_dict() for domain, health in self._domains.items()}
+
+
+_breakers = None
+_breakers_lock = Lock()
+
+
+def get_domain_breakers() -> DomainBreakers:
+    """Return the process-wide DomainBreakers, creating them on first use."""
+    global _breakers
+    if _breakers is None:
+        with _breakers_lock:
+            if _breakers is None:
+                _breakers = DomainBreakers()
+    return _breakers
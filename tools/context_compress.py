@@ -0,0 +1,127 @@
+import re
+import zlib
+from typing import List
+
+import numpy as np
+
+from config import DefaultCFG
+from schemas.agents_schemas import SearchAndScrapeOutput, SearchResult
+
+SHINGLE_SIZE = 5        # words per shingle
+MINHASH_PERMUTATIONS = 64
+CHARS_PER_TOKEN = 4     # rough estimate, good enough for budgeting prompts
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240601)
+_HASH_A = _rng.integers(1, int(_PRIME), size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, int(_PRIME), size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def minhash_signatures(passages: List[List[str]]) -> np.ndarray:
+    """
+    MinHash signature of each tokenized passage over its word shingles.
+
+    Returns:
+        np.ndarray: A (len(passages), MINHASH_PERMUTATIONS) array; the fraction of equal
+        columns between two rows estimates the Jaccard similarity of their shingle sets.
+    """
+    signatures = np.full((len(passages), MINHASH_PERMUTATIONS), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for i, words in enumerate(passages):
+        size = min(SHINGLE_SIZE, len(words))
+        shingles = {" ".join(words[j:j + size]) for j in range(len(words) - size + 1)}
+        if not shingles:
+            continue
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # crc32 values and the coefficients fit in 32 bits, so a * x + b cannot overflow uint64
+        signatures[i] = ((_HASH_A * hashes[:, None] + _HASH_B) % _PRIME).min(axis=0)
+    return signatures
+
+
+def bm25_scores(query: List[str], passages: List[List[str]]) -> np.ndarray:
+    """Okapi BM25 score of each tokenized passage against the query terms."""
+    terms = sorted(set(query))
+    if not terms or not passages:
+        return np.zeros(len(passages))
+    index = {term: k for k, term in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)))
+    for i, words in enumerate(passages):
+        for word in words:
+            k = index.get(word)
+            if k is not None:
+                tf[i, k] += 1
+    lengths = np.array([len(words) for words in passages], dtype=float)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log(1 + (len(passages) - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    return (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def compress_research(research: SearchAndScrapeOutput, query: str, token_budget: int = None,
+                      dedupe_threshold: float = None) -> SearchAndScrapeOutput:
+    """
+    Shrink scraped content to the passages most relevant to the query.
+
+    Passages (the lines of each page's text) are deduplicated with MinHash, dropping any
+    passage whose estimated Jaccard similarity to an earlier one reaches
+    `dedupe_threshold`. The rest are ranked with BM25 against the query and packed,
+    best first, into `token_budget`. Kept passages stay in their original page and
+    line order; pages left without passages are dropped from `results`.
+
+    Args:
+        research: The scraped research.
+        query: The text to rank passages against, usually the topic.
+        token_budget: Approximate token budget for all kept passages, defaults to
+            DefaultCFG.research_token_budget. 0 disables the budget.
+        dedupe_threshold: Similarity at which passages count as duplicates, defaults to
+            DefaultCFG.research_dedupe_threshold.
+
+    Returns:
+        SearchAndScrapeOutput: A copy of `research` with compressed results.
+    """
+    token_budget = DefaultCFG.research_token_budget if token_budget is None else token_budget
+    dedupe_threshold = DefaultCFG.research_dedupe_threshold if dedupe_threshold is None else dedupe_threshold
+
+    passages = [
+        (page, line.strip())
+        for page, result in enumerate(research.results)
+        for line in result.content.splitlines() if line.strip()
+    ]
+    if not passages:
+        return research
+    words = [tokenize(text) for _, text in passages]
+
+    signatures = minhash_signatures(words)
+    kept = []
+    for i in range(len(passages)):
+        if kept and (signatures[kept] == signatures[i]).mean(axis=1).max() >= dedupe_threshold:
+            continue
+        kept.append(i)
+
+    scores = bm25_scores(tokenize(query), [words[i] for i in kept])
+    selected, used = [], 0
+    for rank in np.argsort(-scores, kind="stable"):
+        i = kept[rank]
+        cost = estimate_tokens(passages[i][1])
+        if token_budget and used + cost > token_budget:
+            continue
+        selected.append(i)
+        used += cost
+
+    pages = {}
+    for i in sorted(selected):
+        page, text = passages[i]
+        pages.setdefault(page, []).append(text)
+    return research.model_copy(update={"results": [
+        SearchResult(url=research.results[page].url, content="\n".join(lines)) for page, lines in pages.items()
+    ]})
@@ -0,0 +1,182 @@
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import DefaultCFG
+
+
+def _clocked(clock: list, worker: Callable, *args):
+    """Run `worker(*args)`, first appending its start time to `clock`."""
+    clock.append(time.monotonic())
+    return worker(*args)
+
+
+class FetchEngine:
+    """
+    Concurrent page fetcher backed by a shared, connection-pooled requests session.
+
+    URLs are handed to a bounded thread pool so a batch takes roughly as long as its
+    slowest page instead of the sum of all pages. Results always come back in the
+    order of the input URLs, and any URL that fails or misses the overall deadline
+    is turned into a per-URL value by the caller supplied error handler.
+
+    Attributes:
+        max_workers: Maximum number of URLs fetched at the same time.
+        timeout: Per-request timeout in seconds, passed to every session call.
+        deadline: Overall time budget in seconds for one call to `map`.
+        session: The shared requests.Session reused across all fetches.
+    """
+
+    def __init__(self, max_workers: int = None, timeout: float = None, deadline: float = None,
+                 headers: Optional[dict] = None):
+        """
+        Initialize the FetchEngine.
+
+        Args:
+            max_workers: Concurrency limit, defaults to DefaultCFG.scrape_max_workers.
+            timeout: Per-request timeout, defaults to DefaultCFG.scrape_timeout.
+            deadline: Overall batch deadline, defaults to DefaultCFG.scrape_deadline.
+            headers: Default headers sent with every request.
+        """
+        self.max_workers = max_workers or DefaultCFG.scrape_max_workers
+        self.timeout = timeout or DefaultCFG.scrape_timeout
+        self.deadline = deadline or DefaultCFG.scrape_deadline
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {"User-Agent": "Mozilla/5.0"})
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+        self._latencies = deque(maxlen=200)
+        self._latencies_lock = Lock()
+
+    def map(self, worker: Callable[[requests.Session, str], str], urls: List[str],
+            on_error: Callable[[str, Exception], str]) -> List[str]:
+        """
+        Run `worker(session, url)` for every URL concurrently and collect the results.
+
+        Args:
+            worker: Callable that fetches and processes a single URL using the shared session.
+            urls: The URLs to process.
+            on_error: Callable turning a (url, exception) pair into the value stored for that URL.
+
+        Returns:
+            List[str]: One entry per input URL, in input order.
+        """
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, worker, self.session, url) for url in urls
+        ]
+        wait(futures, timeout=self.deadline)
+
+        results = []
+        for url, future in zip(urls, futures):
+            if not future.done():
+                future.cancel()
+                results.append(on_error(url, TimeoutError(f"deadline of {self.deadline}s exceeded")))
+                continue
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(on_error(url, e))
+        return results
+
+    def hedge_delay(self) -> float:
+        """
+        Seconds after which a fetch in `hedged` counts as slow and a backup is started.
+
+        The DefaultCFG.scrape_hedge_percentile of recent fetch latencies, but at least
+        scrape_hedge_min_delay; scrape_hedge_delay until enough fetches have been seen.
+        """
+        with self._latencies_lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 10:
+            return DefaultCFG.scrape_hedge_delay
+        index = min(len(samples) - 1, int(DefaultCFG.scrape_hedge_percentile * len(samples)))
+        return max(DefaultCFG.scrape_hedge_min_delay, samples[index])
+
+    def hedged(self, worker: Callable[[requests.Session, str], str], urls: List[str],
+               want: int) -> List[Tuple[str, str]]:
+        """
+        Fetch candidate URLs until `want` of them produced a result, hedging slow ones.
+
+        The first `want` candidates start right away. Whenever one fails, returns
+        nothing, or has been running longer than `hedge_delay()`, the next candidate is
+        started as a backup; a slow fetch keeps running and still counts if it finishes
+        first. Running time is measured from when a worker thread picks the fetch up, so
+        fetches waiting for a free worker do not count as slow. Returns as soon as `want`
+        results are in, without waiting for the rest, or when the candidates or the
+        deadline run out.
+
+        Args:
+            worker: Callable fetching and processing one URL; a falsy result or an
+                exception counts as a failed candidate.
+            urls: Candidate URLs, best first.
+            want: Number of results wanted.
+
+        Returns:
+            List[Tuple[str, str]]: Up to `want` (url, result) pairs, in candidate order.
+        """
+        candidates = deque(enumerate(urls))
+        running = {}
+        results = {}
+        delay = self.hedge_delay()
+        deadline = time.monotonic() + self.deadline
+
+        while len(results) < want:
+            now = time.monotonic()
+            # slow fetches stay in `running` but no longer hold one of the `want` slots;
+            # a fetch still queued cannot turn slow before `now + delay`
+            starts = [clock[0] if clock else now for _, _, clock in running.values()]
+            prompt = [started for started in starts if now - started < delay]
+            while candidates and len(prompt) < want - len(results):
+                index, url = candidates.popleft()
+                clock = []
+                future = self._executor.submit(contextvars.copy_context().run, _clocked, clock, worker,
+                                               self.session, url)
+                running[future] = (index, url, clock)
+                prompt.append(now)
+            if not running or now >= deadline:
+                break
+
+            next_slow = min(prompt) + delay if prompt else deadline
+            done, _ = wait(running, timeout=max(0.0, min(deadline, next_slow) - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, url, clock = running.pop(future)
+                if clock:
+                    with self._latencies_lock:
+                        self._latencies.append(time.monotonic() - clock[0])
+                try:
+                    result = future.result()
+                except Exception:
+                    continue
+                if result:
+                    results[index] = (url, result)
+
+        return [results[index] for index in sorted(results)[:want]]
+
+    def close(self):
+        """Shut down the worker pool and release pooled connections."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+_engine = None
+_engine_lock = Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Return the process-wide FetchEngine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = FetchEngine()
+    return _engine
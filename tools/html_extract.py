@@ -0,0 +1,156 @@
+import codecs
+from html.parser import HTMLParser
+from typing import List
+
+
+# Cleaning rules shared by both extraction modes
+SKIP_TAGS = ("script", "style", "footer", "header", "nav", "noscript")
+# Elements without content or end tag (bs4's DEFAULT_EMPTY_ELEMENT_TAGS)
+VOID_TAGS = frozenset((
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image", "img",
+    "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source", "spacer", "track", "wbr",
+))
+MIN_LINE_LENGTH = 50
+MAX_LINES = 15
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+def extract_text(html: str, max_lines: int = MAX_LINES) -> str:
+    """Reduce a full HTML document to its first `max_lines` lines of meaningful text."""
+    from bs4 import BeautifulSoup  # only the "soup" extraction mode needs bs4
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(SKIP_TAGS)):
+        tag.decompose()
+    text = soup.get_text(separator="\n")
+    lines = [line.strip() for line in text.splitlines() if len(line.strip()) > MIN_LINE_LENGTH]
+    return "\n".join(lines[:max_lines])
+
+
+class _TextCollector(HTMLParser):
+    """
+    SAX-style counterpart of `extract_text`.
+
+    Text nodes are cleaned as soon as a tag boundary closes them, content inside
+    SKIP_TAGS is ignored, and `done` flips once `max_lines` qualifying lines exist.
+    Open elements are tracked the way the soup tree builder tracks them: an end tag
+    closes the most recent open element of its name and every element opened inside
+    it, so a skip tag left unclosed ends with its parent, and end tags without an open
+    element are ignored.
+    """
+
+    def __init__(self, max_lines: int):
+        super().__init__(convert_charrefs=True)
+        self.max_lines = max_lines
+        self.lines: List[str] = []
+        self.done = False
+        self._open: List[str] = []
+        self._closed_voids: List[str] = []
+        self._skip_depth = 0
+        self._buffer: List[str] = []
+
+    def flush(self):
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer = []
+        for line in text.splitlines():
+            line = line.strip()
+            if len(line) > MIN_LINE_LENGTH and not self.done:
+                self.lines.append(line)
+                self.done = len(self.lines) >= self.max_lines
+
+    def _close(self, tag):
+        """Close the most recent open `tag` and everything opened inside it; ignore it when none is open."""
+        if tag not in self._open:
+            return
+        while True:
+            closed = self._open.pop()
+            if closed in SKIP_TAGS:
+                self._skip_depth -= 1
+            if closed == tag:
+                break
+
+    def _open_tag(self, tag):
+        self.flush()
+        self._open.append(tag)
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_starttag(self, tag, attrs):
+        self._open_tag(tag)
+        if tag in VOID_TAGS:
+            # closed right away; a later </tag> of the same name is then ignored without ending the text node
+            self._close(tag)
+            self._closed_voids.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open_tag(tag)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_voids:
+            self._closed_voids.remove(tag)
+            return
+        self.flush()
+        self._close(tag)
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._buffer.append(data)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+
+
+def extract_text_stream(response, max_bytes: int, max_lines: int = MAX_LINES, chunk_size: int = 16384) -> str:
+    """
+    Extract text from a streamed requests response without building a document tree.
+
+    Non-HTML content types are rejected before the body is read, at most `max_bytes`
+    are downloaded, and reading stops as soon as `max_lines` qualifying lines are found.
+    The response is always closed so its connection returns to the pool.
+
+    Args:
+        response: A requests.Response obtained with stream=True.
+        max_bytes: Cap on the number of body bytes read.
+        max_lines: Number of qualifying lines to collect.
+        chunk_size: Size of the chunks read from the socket.
+
+    Returns:
+        str: The same text `extract_text` would produce for the bytes read.
+    """
+    try:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            raise ValueError(f"unsupported content type '{content_type}'")
+
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        collector = _TextCollector(max_lines)
+        received = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            received += len(chunk)
+            collector.feed(decoder.decode(chunk))
+            if collector.done or received >= max_bytes:
+                break
+        else:
+            collector.feed(decoder.decode(b"", final=True))
+            collector.close()
+        collector.flush()
+        return "\n".join(collector.lines[:max_lines])
+    finally:
+        response.close()
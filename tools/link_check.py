@@ -0,0 +1,200 @@
+import contextvars
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import DefaultCFG
+from core.metrics import record_fetch
+from tools.page_cache import normalize_url
+
+# Answers that say the URL itself is gone; anything else that is not a success
+# (403, 429, 5xx, timeouts, connection errors other than an unknown host) may be bot
+# blocking or a passing outage and stays unverified
+DEAD_STATUSES = (404, 410)
+# Servers answering HEAD with these are asked again with a GET
+HEAD_UNSUPPORTED = (400, 403, 405, 501)
+# Resolver answers saying the host name does not exist, as opposed to a failing lookup
+_UNKNOWN_HOST = tuple(getattr(socket, name) for name in ("EAI_NONAME", "EAI_NODATA") if hasattr(socket, name))
+
+
+def _unknown_host(error: BaseException) -> bool:
+    """Return whether a connection error comes from a DNS lookup that found no such host."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, socket.gaierror):
+            return error.errno in _UNKNOWN_HOST
+        # requests wraps urllib3's MaxRetryError, whose `reason` holds the connection error
+        nested = getattr(error, "reason", None)
+        if not isinstance(nested, BaseException) and error.args and isinstance(error.args[0], BaseException):
+            nested = error.args[0]
+        error = nested if isinstance(nested, BaseException) else (error.__cause__ or error.__context__)
+    return False
+
+
+@dataclass
+class LinkStatus:
+    """
+    Outcome of checking one URL.
+
+    Attributes:
+        url: The checked URL.
+        ok: True if it resolves, False if it is dead, None if that could not be decided.
+        status: Final HTTP status, None if no response was received.
+        cached: Whether the outcome came from the LinkCache.
+    """
+    url: str
+    ok: Optional[bool]
+    status: Optional[int] = None
+    cached: bool = False
+
+
+class LinkCache:
+    """
+    Persistent SQLite cache of link check outcomes keyed by normalized URL.
+
+    Only decided outcomes are stored. Working links are trusted for `ttl` seconds and
+    dead ones for `dead_ttl`, so a link that comes back is noticed sooner.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, dead_ttl: float = None):
+        self.path = path or DefaultCFG.link_cache_path
+        self.ttl = ttl if ttl is not None else DefaultCFG.link_cache_ttl
+        self.dead_ttl = dead_ttl if dead_ttl is not None else DefaultCFG.link_cache_dead_ttl
+        self.hits = self.misses = 0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS links (key TEXT PRIMARY KEY, ok INTEGER, status INTEGER, checked_at REAL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, LinkStatus]:
+        """Return the unexpired outcomes of `urls`, keyed by the URL as given."""
+        keys = {normalize_url(url): url for url in urls}
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key, ok, status, checked_at in self._conn.execute(
+                f"SELECT key, ok, status, checked_at FROM links WHERE key IN ({','.join('?' * len(keys))})",
+                list(keys)
+            ):
+                if now - checked_at < (self.ttl if ok else self.dead_ttl):
+                    found[keys[key]] = LinkStatus(keys[key], bool(ok), status, cached=True)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, results: Iterable[LinkStatus]):
+        now = time.time()
+        rows = [(normalize_url(r.url), int(r.ok), r.status, now) for r in results if r.ok is not None]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class LinkChecker:
+    """
+    Checks many URLs at once with short HEAD requests.
+
+    Every URL not answered by the cache is probed on its own worker thread, so a batch
+    takes about as long as its slowest URL, capped by `deadline`. URLs still pending at
+    the deadline come back undecided (`ok=None`) and are not cached.
+
+    Attributes:
+        max_workers: URLs probed at the same time.
+        timeout: Per-request timeout in seconds.
+        deadline: Overall time budget in seconds for one call to `check`.
+    """
+
+    def __init__(self, max_workers: int = None, timeout: float = None, deadline: float = None,
+                 cache: Optional[LinkCache] = None):
+        self.max_workers = max_workers or DefaultCFG.link_check_workers
+        self.timeout = timeout or DefaultCFG.link_check_timeout
+        self.deadline = deadline or DefaultCFG.link_check_deadline
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": "Mozilla/5.0"})
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="linkcheck")
+
+    def _probe(self, url: str) -> LinkStatus:
+        started = time.perf_counter()
+        try:
+            r = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if r.status_code in HEAD_UNSUPPORTED:
+                r = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+                r.close()
+        except requests.Timeout:
+            record_fetch("link", url, "error", time.perf_counter() - started)
+            return LinkStatus(url, None)
+        except requests.exceptions.InvalidURL:
+            record_fetch("link", url, "error", time.perf_counter() - started)
+            return LinkStatus(url, False)
+        except requests.ConnectionError as e:
+            # only a host that does not exist is dead; resets, refusals, TLS errors and failing
+            # lookups can be passing problems on either end
+            record_fetch("link", url, "error", time.perf_counter() - started)
+            return LinkStatus(url, False if _unknown_host(e) else None)
+        except requests.RequestException:
+            record_fetch("link", url, "error", time.perf_counter() - started)
+            return LinkStatus(url, None)
+        record_fetch("link", url, r.status_code, time.perf_counter() - started)
+        if r.ok:
+            return LinkStatus(url, True, r.status_code)
+        return LinkStatus(url, False if r.status_code in DEAD_STATUSES else None, r.status_code)
+
+    def check(self, urls: Iterable[str]) -> Dict[str, LinkStatus]:
+        """
+        Check `urls` (duplicates are checked once).
+
+        Returns:
+            Dict[str, LinkStatus]: The outcome of every URL, keyed by URL.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        results = self.cache.get_many(urls) if self.cache else {}
+        pending = {
+            self._executor.submit(contextvars.copy_context().run, self._probe, url): url
+            for url in urls if url not in results
+        }
+        done, _ = wait(pending, timeout=self.deadline)
+        for future, url in pending.items():
+            results[url] = future.result() if future in done else LinkStatus(url, None)
+        if self.cache:
+            self.cache.put_many(results[url] for url in pending.values() if not results[url].cached)
+        return results
+
+
+_checker = None
+_checker_lock = Lock()
+
+
+def get_link_checker() -> LinkChecker:
+    """Return the process-wide LinkChecker, with a LinkCache unless DefaultCFG.link_cache_enabled is off."""
+    global _checker
+    if _checker is None:
+        with _checker_lock:
+            if _checker is None:
+                _checker = LinkChecker(cache=LinkCache() if DefaultCFG.link_cache_enabled else None)
+    return _checker
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import DefaultCFG
+
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings share one cache entry.
+
+    Lowercases the scheme and host, drops default ports, fragments and common
+    tracking parameters, sorts the query string and strips a trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+@dataclass
+class CachedPage:
+    url: str
+    content: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+
+class PageCache:
+    """
+    Persistent SQLite cache of cleaned page text keyed by normalized URL.
+
+    Entries keep the ETag/Last-Modified validators of the response they came from so
+    stale entries can be revalidated with a conditional GET instead of re-downloaded
+    and re-parsed. Once the stored content exceeds `max_bytes`, the least recently
+    used entries are evicted.
+
+    Attributes:
+        ttl: Seconds an entry is served without revalidation.
+        max_bytes: Size cap for the stored page text.
+        hits: Lookups served from a fresh entry.
+        misses: Lookups with no usable entry.
+        revalidated: Stale entries confirmed unchanged by a 304 response.
+        evictions: Entries removed to respect `max_bytes`.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, max_bytes: int = None):
+        """
+        Initialize the PageCache.
+
+        Args:
+            path: SQLite file location, defaults to DefaultCFG.page_cache_path.
+            ttl: Freshness window in seconds, defaults to DefaultCFG.page_cache_ttl.
+            max_bytes: Size cap, defaults to DefaultCFG.page_cache_max_bytes.
+        """
+        self.path = path or DefaultCFG.page_cache_path
+        self.ttl = ttl if ttl is not None else DefaultCFG.page_cache_ttl
+        self.max_bytes = max_bytes or DefaultCFG.page_cache_max_bytes
+        self.hits = self.misses = self.revalidated = self.evictions = 0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY, url TEXT, content TEXT, etag TEXT, last_modified TEXT,"
+            " fetched_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages(last_access)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the stored entry for `url` (fresh or stale) and mark it as recently used."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CachedPage(*row)
+
+    def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store the cleaned text for `url` and evict LRU entries beyond the size cap."""
+        key = normalize_url(url)
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, content, etag, last_modified, now, now, size),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str):
+        """Restart the freshness window of an entry after a 304 Not Modified response."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?", (now, now, normalize_url(url))
+            )
+            self._conn.commit()
+            self.revalidated += 1
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM pages ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def record(self, hit: bool):
+        """Count a lookup as a hit or a miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Return the process-wide PageCache, or None when caching is disabled."""
+    global _cache
+    if not DefaultCFG.page_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+    return _cache
@@ -0,0 +1,306 @@
+import json
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from threading import Lock
+from typing import List, Optional
+
+import numpy as np
+
+from config import DefaultCFG
+from schemas.agents_schemas import SearchAndScrapeOutput, SearchResult
+from tools.context_compress import tokenize
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the threads of one process are coordinated
+    fcntl = None
+
+PASSAGE_WORDS = 120     # words per indexed passage
+SEARCH_BLOCK = 65536    # rows scored per matrix product, bounds the memory of a search
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it of on or that the this to what why with".split()
+)
+
+
+def hash_embed(texts: List[str], dim: int = None) -> np.ndarray:
+    """
+    Embed texts with a hashing vectorizer, locally and without a model.
+
+    Every word and word bigram (stop words removed) is hashed with CRC32 into one of
+    `dim` buckets with a hash-derived sign, counts are damped with 1 + log(tf), and
+    each row is L2-normalized, so the dot product of two rows is their cosine similarity.
+
+    Returns:
+        np.ndarray: A (len(texts), dim) float32 array.
+    """
+    dim = dim or DefaultCFG.research_index_dim
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = [w for w in tokenize(text) if w not in _STOPWORDS]
+        features = {}
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            features[feature] = features.get(feature, 0) + 1
+        for feature, count in features.items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            vectors[row, h % dim] += (1 + np.log(count)) * (1 if h & 0x80000000 else -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def split_passages(text: str, words: int = PASSAGE_WORDS) -> List[str]:
+    """Cut page text into passages of about `words` words, keeping lines together where possible."""
+    passages, current, count = [], [], 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        current.append(line)
+        count += len(line.split())
+        if count >= words:
+            passages.append("\n".join(current))
+            current, count = [], 0
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+def merge_research(fresh: SearchAndScrapeOutput, recalled: SearchAndScrapeOutput) -> SearchAndScrapeOutput:
+    """Add the recalled pages to freshly scraped research, skipping URLs that were just scraped again."""
+    scraped = {result.url for result in fresh.results}
+    extra = [result for result in recalled.results if result.url not in scraped]
+    return SearchAndScrapeOutput(
+        keyword=fresh.keyword,
+        urls=list(dict.fromkeys(fresh.urls + [result.url for result in extra])),
+        results=fresh.results + extra
+    )
+
+
+class ResearchIndex:
+    """
+    Local index of scraped research passages, reused across related topics.
+
+    Passages are embedded with `hash_embed` and stored as rows of a memory-mapped
+    float32 matrix (`vectors.f32` under `path`), which grows by doubling. The text,
+    source URL and topic of each row are appended to `passages.jsonl`, and the topics
+    are embedded again in memory when the index is opened.
+
+    `recall` first compares a new topic with the indexed topics and then ranks only the
+    passages of related topics that are not older than the age limit against it, with
+    one matrix product per block of rows.
+    Both take milliseconds for hundreds of thousands of passages and need no network.
+
+    Several processes may share one directory; appends are serialized with a file lock
+    where the platform has one, and every process picks up the rows the others appended.
+
+    Attributes:
+        hits: Recalls that found related research.
+        misses: Recalls that found none.
+    """
+
+    def __init__(self, path: str = None, dim: int = None):
+        """
+        Initialize the ResearchIndex.
+
+        Args:
+            path: Directory of the index, defaults to DefaultCFG.research_index_path.
+            dim: Embedding dimensions, defaults to DefaultCFG.research_index_dim. Must
+                stay the same for an existing index.
+        """
+        self.path = path or DefaultCFG.research_index_path
+        self.dim = dim or DefaultCFG.research_index_dim
+        self.hits = self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._meta_path = os.path.join(self.path, "passages.jsonl")
+        self._lock_path = os.path.join(self.path, ".lock")
+        if not os.path.exists(self._vectors_path):
+            open(self._vectors_path, "wb").close()
+
+        self._lock = Lock()
+        self._vectors = None
+        self._capacity = 0
+        self._meta_offset = 0
+        self._passages: List[dict] = []
+        self._keys = set()
+        self._topics: List[str] = []
+        self._topic_ids = {}
+        self._topic_vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._row_topics = np.zeros(0, dtype=np.int32)
+        self._row_added = np.zeros(0, dtype=np.float64)
+        with self._lock:
+            self._sync()
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _map(self):
+        """(Re)open the vector matrix at the current file size."""
+        self._capacity = os.path.getsize(self._vectors_path) // (4 * self.dim)
+        self._vectors = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self.dim))
+            if self._capacity else None
+        )
+
+    def _sync(self):
+        """Load the rows appended since the last call, by this or another process."""
+        with open(self._meta_path, "a+", encoding="utf-8") as file:
+            file.seek(self._meta_offset)
+            lines = file.readlines()
+            if lines and not lines[-1].endswith("\n"):
+                lines.pop()  # a row still being written
+            self._meta_offset += sum(len(line.encode("utf-8")) for line in lines)
+        new_topics = []
+        for line in lines:
+            row = json.loads(line)
+            topic = self._topic_ids.get(row["topic"])
+            if topic is None:
+                topic = self._topic_ids[row["topic"]] = len(self._topics)
+                self._topics.append(row["topic"])
+                new_topics.append(row["topic"])
+            row["topic_id"] = topic
+            self._passages.append(row)
+            self._keys.add(row["key"])
+        if new_topics:
+            self._topic_vectors = np.vstack([self._topic_vectors, hash_embed(new_topics, self.dim)])
+        if lines:
+            self._row_topics = np.array([row["topic_id"] for row in self._passages], dtype=np.int32)
+            self._row_added = np.array([row["added_at"] for row in self._passages], dtype=np.float64)
+        if len(self._passages) > self._capacity:
+            self._map()
+
+    def add(self, research: SearchAndScrapeOutput, topic: str) -> int:
+        """
+        Index the pages of `research` under `topic`.
+
+        Pages are split into passages of about PASSAGE_WORDS words; passages already in
+        the index are skipped.
+
+        Returns:
+            int: The number of passages added.
+        """
+        passages = [
+            (result.url, text)
+            for result in research.results
+            for text in split_passages(result.content)
+        ]
+        if not passages:
+            return 0
+        with self._lock, self._file_lock():
+            self._sync()
+            rows, seen = [], set()
+            for url, text in passages:
+                key = format(zlib.crc32(" ".join(tokenize(text)).encode("utf-8")), "08x")
+                if key in self._keys or key in seen:
+                    continue
+                seen.add(key)
+                rows.append({"key": key, "topic": topic, "url": url, "text": text, "added_at": time.time()})
+            if not rows:
+                return 0
+
+            start = len(self._passages)
+            if start + len(rows) > self._capacity:
+                capacity = max(1024, self._capacity)
+                while capacity < start + len(rows):
+                    capacity *= 2
+                self._vectors = None
+                with open(self._vectors_path, "r+b") as file:
+                    file.truncate(capacity * self.dim * 4)
+                self._map()
+            self._vectors[start:start + len(rows)] = hash_embed([row["text"] for row in rows], self.dim)
+            self._vectors.flush()
+            # rows become visible once their metadata is written, after their vectors
+            with open(self._meta_path, "a", encoding="utf-8") as file:
+                file.write("".join(json.dumps(row) + "\n" for row in rows))
+            self._sync()
+        return len(rows)
+
+    def recall(self, topic: str, top_k: int = None, topic_similarity: float = None,
+               min_passages: int = None, max_age: float = None) -> Optional[SearchAndScrapeOutput]:
+        """
+        Return indexed research for `topic` when related topics have been researched.
+
+        Args:
+            topic: The new topic.
+            top_k: Most passages to return, defaults to DefaultCFG.research_index_top_k.
+            topic_similarity: Cosine similarity at which an indexed topic counts as related,
+                defaults to DefaultCFG.research_index_topic_similarity.
+            min_passages: Fewest passages worth returning, defaults to
+                DefaultCFG.research_index_min_passages.
+            max_age: Seconds after which indexed passages are no longer returned, defaults
+                to DefaultCFG.research_index_max_age; 0 returns passages of any age.
+
+        Returns:
+            Optional[SearchAndScrapeOutput]: The best passages of related topics grouped
+                by URL, best page first, or None if there are not enough.
+        """
+        top_k = top_k or DefaultCFG.research_index_top_k
+        topic_similarity = topic_similarity if topic_similarity is not None \
+            else DefaultCFG.research_index_topic_similarity
+        min_passages = min_passages or DefaultCFG.research_index_min_passages
+        max_age = DefaultCFG.research_index_max_age if max_age is None else max_age
+        query = hash_embed([topic], self.dim)[0]
+
+        with self._lock:
+            self._sync()
+            related = np.flatnonzero(self._topic_vectors @ query >= topic_similarity)
+            if related.size:
+                selected = np.isin(self._row_topics, related)
+                if max_age:
+                    selected &= self._row_added >= time.time() - max_age
+                rows = np.flatnonzero(selected)
+            else:
+                rows = related
+            if rows.size < min_passages:
+                self.misses += 1
+                return None
+            scores = np.concatenate([
+                self._vectors[rows[i:i + SEARCH_BLOCK]] @ query for i in range(0, rows.size, SEARCH_BLOCK)
+            ])
+            best = rows[np.argsort(-scores, kind="stable")[:top_k]]
+            hits = [self._passages[i] for i in best]
+            self.hits += 1
+
+        pages = {}
+        for hit in hits:
+            pages.setdefault(hit["url"], []).append(hit["text"])
+        return SearchAndScrapeOutput(
+            keyword=topic,
+            urls=list(pages),
+            results=[SearchResult(url=url, content="\n".join(texts)) for url, texts in pages.items()]
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "passages": len(self._passages),
+                "topics": len(self._topics), "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_index = None
+_index_lock = Lock()
+
+
+def get_research_index() -> Optional[ResearchIndex]:
+    """Return the process-wide ResearchIndex, or None when DefaultCFG.research_index_enabled is off."""
+    global _index
+    if not DefaultCFG.research_index_enabled:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ResearchIndex()
+    return _index
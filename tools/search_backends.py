@@ -0,0 +1,160 @@
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional
+
+from config import DefaultCFG
+from core.metrics import record_fetch
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lowercase a search keyword, trim surrounding punctuation and collapse whitespace."""
+    return re.sub(r"\s+", " ", keyword.strip(" \t\n\"'.,;:!?").lower())
+
+
+class SearchBackend(ABC):
+    """
+    Interface for web search providers used by get_search_results_tool.
+
+    Implementations return organic result URLs for a keyword, best match first.
+    """
+
+    @abstractmethod
+    def search(self, keyword: str, num_results: int) -> List[str]:
+        """Return up to `num_results` result URLs for `keyword`."""
+
+
+class SerperBackend(SearchBackend):
+    """
+    Search backend calling the Serper API, or any server speaking its protocol
+    (such as the local stand-in in tools/serper_stub.py).
+    """
+
+    def __init__(self, api_key: str = None, endpoint: str = None):
+        self.api_key = api_key or DefaultCFG.serper_api_key
+        self.endpoint = endpoint or DefaultCFG.serper_endpoint
+
+    def search(self, keyword: str, num_results: int) -> List[str]:
+        from tools.fetch_engine import get_fetch_engine
+
+        headers = {
+            "X-API-KEY": self.api_key,
+            "Content-Type": "application/json"
+        }
+        started = time.perf_counter()
+        try:
+            response = get_fetch_engine().session.post(
+                self.endpoint, headers=headers, json={"q": keyword}, timeout=DefaultCFG.scrape_timeout
+            )
+        except Exception:
+            record_fetch("search", self.endpoint, "error", time.perf_counter() - started)
+            raise
+        record_fetch("search", self.endpoint, response.status_code, time.perf_counter() - started,
+                     len(response.content))
+        response.raise_for_status()
+        results = response.json()
+        return [res["link"] for res in results.get("organic", [])[:num_results] if "link" in res]
+
+
+class LocalSearchBackend(SearchBackend):
+    """
+    File-backed search backend for offline runs and benchmarks.
+
+    The file is a JSON object mapping keywords to Serper-style organic result lists,
+    e.g. {"ai agents": [{"title": "...", "link": "https://..."}]}. Keywords are
+    matched after normalization; a "*" entry, if present, answers every other query.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or DefaultCFG.local_search_path
+        with open(self.path, "r", encoding="utf-8") as file:
+            raw = json.load(file)
+        self.results = {normalize_keyword(k): v for k, v in raw.items()}
+
+    def organic(self, keyword: str) -> List[dict]:
+        """Return the stored organic results for a keyword."""
+        return self.results.get(normalize_keyword(keyword), self.results.get("*", []))
+
+    def search(self, keyword: str, num_results: int) -> List[str]:
+        return [res["link"] for res in self.organic(keyword)[:num_results] if "link" in res]
+
+
+class SearchCache:
+    """
+    In-memory TTL cache of search results keyed by (normalized keyword, num_results).
+
+    Bounded to `max_entries`, evicting the least recently used entry first.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = ttl if ttl is not None else DefaultCFG.search_cache_ttl
+        self.max_entries = max_entries or DefaultCFG.search_cache_max_entries
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, keyword: str, num_results: int) -> Optional[List[str]]:
+        key = (normalize_keyword(keyword), num_results)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, keyword: str, num_results: int, links: List[str]):
+        key = (normalize_keyword(keyword), num_results)
+        with self._lock:
+            self._entries[key] = (time.time(), list(links))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_backend = None
+_search_cache = SearchCache()
+_backend_lock = Lock()
+
+
+def get_search_backend() -> SearchBackend:
+    """Return the process-wide backend selected by DefaultCFG.search_backend."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if DefaultCFG.search_backend == "local":
+                    _backend = LocalSearchBackend()
+                elif DefaultCFG.search_backend == "serper":
+                    _backend = SerperBackend()
+                else:
+                    raise ValueError(f"Unknown search backend: {DefaultCFG.search_backend!r}")
+    return _backend
+
+
+def set_search_backend(backend: SearchBackend):
+    """Replace the process-wide backend, e.g. with a LocalSearchBackend in benchmarks."""
+    global _backend
+    _backend = backend
+
+
+def get_search_cache() -> SearchCache:
+    return _search_cache
+
+
+def search(keyword: str, num_results: int = 5) -> List[str]:
+    """Return result URLs for a keyword, consulting the TTL cache before the backend."""
+    links = _search_cache.get(keyword, num_results)
+    if links is None:
+        links = get_search_backend().search(keyword, num_results)
+        _search_cache.put(keyword, num_results, links)
+    return links
@@ -0,0 +1,51 @@
+"""
+Local stand-in for the Serper search API.
+
+Serves POST /search with Serper's response shape from a LocalSearchBackend file, so
+the pipeline can run offline by pointing DefaultCFG.serper_endpoint at it:
+
+    python -m tools.serper_stub --data search_results.json --port 8765
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.search_backends import LocalSearchBackend
+
+
+def make_server(backend: LocalSearchBackend, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Build (but do not start) an HTTP server answering Serper-style queries from `backend`."""
+
+    class SerperStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.rstrip("/") != "/search":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length) or b"{}").get("q", "")
+            body = json.dumps({
+                "searchParameters": {"q": query},
+                "organic": [dict(res, position=i + 1) for i, res in enumerate(backend.organic(query))],
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), SerperStubHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local Serper-compatible search endpoint.")
+    parser.add_argument("--data", required=True, help="JSON file mapping keywords to organic results")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = make_server(LocalSearchBackend(args.data), args.host, args.port)
+    print(f"Serper stand-in listening on http://{args.host}:{args.port}/search")
+    server.serve_forever()
@@ -1,44 +1,156 @@
-from crewai.tools import tool
+import time
+from threading import Lock
+
 from typing import List
-import requests
-from bs4 import BeautifulSoup
 from config import DefaultCFG
+from core.metrics import record_fetch
+from tools.circuit_breaker import CircuitOpenError, domain_of, get_domain_breakers
+from tools.html_extract import extract_text, extract_text_stream
+from tools.page_cache import get_page_cache
+from tools.search_backends import search
+from schemas.agents_schemas import SearchAndScrapeOutput, SearchResult
 
 
-@tool
-def get_search_results_tool(keyword: str, num_results: int = 5) -> List[str]:
+def search_results(keyword: str, num_results: int = 5) -> List[str]:
     """
     Perform a web search using the Serper API and return the top num_results result URLs."""
-    # Your API key can be loaded from a config
-    serper_api_key = DefaultCFG.serper_api_key
-    url = "https://google.serper.dev/search"
-    headers = {
-        "X-API-KEY": serper_api_key,
-        "Content-Type": "application/json"
-    }
-    data = {"q": keyword}
-    response = requests.post(url, headers=headers, json=data)
-    response.raise_for_status()
-    results = response.json()
-    return [res["link"] for res in results.get("organic", [])[:num_results] if "link" in res]
-
-
-@tool
-def scrape_search_results_tool(urls: List[str]) -> List[str]:
+    return search(keyword, num_results)
+
+
+def _scrape_page(session, url: str) -> str:
+    """
+    Return the cleaned text of a page, served from the page cache when possible.
+
+    Raises:
+        CircuitOpenError: If the page's domain is being skipped and nothing is cached.
+        requests.HTTPError: If the server answers with an error status.
+    """
+    cache = get_page_cache()
+    cached = cache.get(url) if cache else None
+    if cached and cached.is_fresh(cache.ttl):
+        cache.record(hit=True)
+        return cached.content
+    if cache:
+        cache.record(hit=False)
+
+    breakers = get_domain_breakers()
+    if not breakers.allow(url):
+        if cached:
+            return cached.content
+        raise CircuitOpenError(f"skipping {domain_of(url)} after repeated failures")
+
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    streaming = DefaultCFG.scrape_extraction == "stream"
+    started = time.perf_counter()
+    try:
+        r = session.get(url, headers=headers, timeout=DefaultCFG.scrape_timeout, stream=streaming)
+    except Exception:
+        record_fetch("page", url, "error", time.perf_counter() - started)
+        breakers.record(url, ok=False, seconds=time.perf_counter() - started)
+        raise
+    if cached and r.status_code == 304:
+        r.close()
+        record_fetch("page", url, 304, time.perf_counter() - started)
+        breakers.record(url, ok=True, seconds=time.perf_counter() - started)
+        cache.refresh(url)
+        return cached.content
+    if not r.ok:
+        r.close()
+        record_fetch("page", url, r.status_code, time.perf_counter() - started)
+        # a missing page says nothing about the host, refusals and server errors do
+        breakers.record(url, ok=r.status_code < 500 and r.status_code not in (403, 429),
+                        seconds=time.perf_counter() - started)
+        r.raise_for_status()
+
+    try:
+        if streaming:
+            content = extract_text_stream(r, max_bytes=DefaultCFG.scrape_max_bytes)
+            nbytes = r.raw.tell()
+        else:
+            content = extract_text(r.text)
+            nbytes = len(r.content)
+    except Exception:
+        # unsupported content type or a broken body; recording it also ends a half-open trial
+        r.close()
+        record_fetch("page", url, "error", time.perf_counter() - started)
+        breakers.record(url, ok=False, seconds=time.perf_counter() - started)
+        raise
+    record_fetch("page", url, r.status_code, time.perf_counter() - started, nbytes)
+    breakers.record(url, ok=True, seconds=time.perf_counter() - started)
+    if cache:
+        cache.put(url, content, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    return content
+
+
+def _scrape_error(url: str, e: Exception) -> str:
+    return f"⚠️ Error scraping {url}: {e}"
+
+
+def scrape_urls(urls: List[str]) -> List[str]:
+    """Scrape all URLs concurrently, keeping input order and per-URL error strings."""
+    from tools.fetch_engine import get_fetch_engine
+
+    return get_fetch_engine().map(_scrape_page, urls, on_error=_scrape_error)
+
+
+def research_topic(keyword: str, num_results: int = None) -> SearchAndScrapeOutput:
+    """
+    Search for a keyword and scrape the results directly, without going through an LLM.
+
+    DefaultCFG.research_overfetch extra results are requested as backup candidates.
+    Candidates on domains with an open circuit are skipped, the rest are fetched with
+    hedging (see FetchEngine.hedged) until `num_results` pages yielded text, so one slow
+    or hanging site does not hold up the stage. Pages that fail to load or yield no
+    text are left out of `results`.
+
+    Args:
+        keyword: The search keyword.
+        num_results: Number of search results to scrape, defaults to DefaultCFG.research_results.
+
+    Returns:
+        SearchAndScrapeOutput: The URLs whose text was used and the text of each, in
+            search result order.
+    """
+    from tools.fetch_engine import get_fetch_engine
+
+    num_results = num_results or DefaultCFG.research_results
+    urls = search(keyword, num_results + DefaultCFG.research_overfetch)
+    breakers = get_domain_breakers()
+    candidates = [url for url in urls if not breakers.is_open(url)]
+    pages = get_fetch_engine().hedged(_scrape_page, candidates, want=num_results)
+    return SearchAndScrapeOutput(
+        keyword=keyword,
+        urls=[url for url, _ in pages],
+        results=[SearchResult(url=url, content=content) for url, content in pages]
+    )
+
+
+def scrape_search_results(urls: List[str]) -> List[str]:
     """Scrape the content of each URL and return a list of cleaned text content."""
-    # Set a
-    headers = {"User-Agent": "Mozilla/5.0"}
-    results = []
-    for url in urls:
-        try:
-            r = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(r.text, "html.parser")
-            for tag in soup(["script", "style", "footer", "header", "nav", "noscript"]):
-                tag.decompose()
-            text = soup.get_text(separator="\n")
-            lines = [line.strip() for line in text.splitlines() if len(line.strip()) > 50]
-            content = "\n".join(lines[:15])
-            results.append(content)
-        except Exception as e:
-            results.append(f"⚠️ Error scraping {url}: {e}")
-    return results
+    return scrape_urls(urls)
+
+
+# The crewai tools wrapping the functions above are built on first access, so importing
+# this module (and requests, via the fetch engine) does not pull in crewai.
+_TOOL_FUNCTIONS = {
+    "get_search_results_tool": search_results,
+    "scrape_search_results_tool": scrape_search_results,
+}
+_tools = {}
+_tools_lock = Lock()
+
+
+def __getattr__(name):
+    if name not in _TOOL_FUNCTIONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _tools_lock:
+        if name not in _tools:
+            from crewai.tools import tool
+
+            _tools[name] = tool(name)(_TOOL_FUNCTIONS[name])
+        return _tools[name]
@@ -1,20 +1,30 @@
-import streamlit as st
-from crewai import LLM
-from core.article_manger import ArticleMaker
+import threading
+import time
 
-from crewai import LLM
+import streamlit as st
+from core.article_archive import get_article_archive
+from core.events import EventStream, markdown_preview
+from core.pipeline import LazyPipeline
 
 
 
 from config import DefaultCFG
 
-llm = LLM(
-    model=DefaultCFG.llm_model,
-    api_key=DefaultCFG.api_key
-)
+@st.cache_resource
+def get_pipeline() -> LazyPipeline:
+    """
+    One pipeline per server process, not rebuilt on every Streamlit rerun.
+
+    It is built in the background as soon as the first page loads, so the page renders
+    without waiting for crewai and the agents.
+    """
+    pipeline = LazyPipeline()
+    if DefaultCFG.warmup_on_start:
+        pipeline.warm_up()
+    return pipeline
 
 
-maker = ArticleMaker(llm)
+pipeline = get_pipeline()
 
 # Page config
 st.set_page_config(
@@ -26,6 +36,127 @@ st.set_page_config(
 # Initialize session state
 if 'generated_article' not in st.session_state:
     st.session_state.generated_article = None
+if 'stage_outputs' not in st.session_state:
+    st.session_state.stage_outputs = {}
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 1
+if 'history_article' not in st.session_state:
+    st.session_state.history_article = None
+
+HISTORY_PAGE_SIZE = 10
+
+STAGE_LABELS = {
+    "search_scrape": "Researching the web",
+    "writing_style": "Choosing a writing style",
+    "article_structure": "Outlining the article",
+    "article_writing": "Writing the article",
+    "verify": "Checking links and section lengths",
+}
+
+
+def generate_with_progress(topic):
+    """
+    Run the generation in a background thread and render its events as they arrive.
+
+    Returns:
+        tuple: The article and a dict of structured stage outputs.
+    """
+    events = EventStream()
+    outcome = {}
+
+    def run():
+        try:
+            outcome["article"] = pipeline.get().make(topic, events=events)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            events.close()
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+
+    status = st.status("🤖 Generating your article...", expanded=True)
+    preview = st.empty()
+    streamed = ""
+    stage_outputs = {}
+    for event in events.follow():
+        if event.type == "stage_started":
+            status.write(f"⏳ {STAGE_LABELS.get(event.stage, event.stage)}...")
+        elif event.type == "stage_fallback":
+            status.write(f"↩️ {STAGE_LABELS.get(event.stage, event.stage)}: {event.data}, using the agent...")
+        elif event.type == "stage_finished":
+            stage_outputs[event.stage] = event.data
+            status.write(f"✅ {STAGE_LABELS.get(event.stage, event.stage)}")
+        elif event.type == "section_finished":
+            status.write(f"✍️ Section {event.data['index'] + 1}/{event.data['total']}: {event.data['title']}")
+        elif event.type == "token":
+            streamed += event.data
+            preview.markdown(markdown_preview(streamed))
+    worker.join()
+    preview.empty()
+
+    if "error" in outcome:
+        status.update(label="Generation failed", state="error")
+        raise outcome["error"]
+    status.update(label="Article ready", state="complete", expanded=False)
+    return outcome["article"], stage_outputs
+
+
+def show_archived(article_id):
+    """Render one archived article with its download button and run details."""
+    record = get_article_archive().get(article_id)
+    if record is None:
+        st.warning("This article is no longer in the archive.")
+        return
+    tab1, tab2 = st.tabs(["📝 Article", "🔍 Run Details"])
+    with tab1:
+        st.markdown(record["article"])
+        st.download_button(
+            label="Download Article (Markdown)",
+            data=record["article"],
+            file_name=f"article_{record['id']}.md",
+            mime="text/markdown",
+            key=f"download_{record['id']}"
+        )
+    with tab2:
+        st.json({key: record[key] for key in ("topic", "style", "structure", "sources", "timings")})
+
+
+def history():
+    """Search and page through earlier articles."""
+    st.title("📚 Article History")
+    archive = get_article_archive()
+    if archive is None:
+        st.info("The article archive is disabled (`archive_enabled` in config.py).")
+        return
+
+    query = st.text_input("Search articles:", placeholder="Words from the topic or the article")
+    if query != st.session_state.get("history_query"):
+        st.session_state.history_query = query
+        st.session_state.history_page = 1
+    result = archive.search(query, page=st.session_state.history_page, per_page=HISTORY_PAGE_SIZE)
+    pages = max(1, -(-result["total"] // HISTORY_PAGE_SIZE))
+    st.caption(f"{result['total']} articles, page {result['page']} of {pages}")
+
+    for item in result["items"]:
+        with st.container(border=True):
+            st.markdown(f"**{item['topic']}** · {item['words']} words · "
+                        f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(item['created_at']))}")
+            st.caption(item["preview"] + "…")
+            if st.button("Open", key=f"open_{item['id']}"):
+                st.session_state.history_article = item["id"]
+
+    previous, _, following = st.columns([1, 4, 1])
+    if previous.button("← Newer", disabled=result["page"] <= 1):
+        st.session_state.history_page -= 1
+        st.rerun()
+    if following.button("Older →", disabled=result["page"] >= pages):
+        st.session_state.history_page += 1
+        st.rerun()
+
+    if st.session_state.history_article is not None:
+        st.divider()
+        show_archived(st.session_state.history_article)
 
 
 def main():
@@ -42,17 +173,24 @@ def main():
         help="Be specific and descriptive for better results"
     )
 
+    # Earlier articles on the same topic can be reused instead of generated again
+    archive = get_article_archive()
+    matches = archive.search(topic, per_page=3) if archive is not None and topic else None
+    if matches and matches["total"]:
+        with st.expander(f"📚 Earlier articles matching this topic: {matches['total']}"):
+            for item in matches["items"]:
+                st.markdown(f"**{item['topic']}** · {item['words']} words")
+                st.caption(item["preview"] + "…")
+            st.caption("Open them from the History view in the sidebar.")
+
     # Generate button
     if st.button("Generate Article", type="primary", disabled=not topic):
         try:
-            with st.spinner("🤖 Generating your article... This might take a few minutes."):
-                # Initialize ArticleMaker
-                
-                # Generate article
-                result = maker.make(topic)
-                
-                # Store in session state
-                st.session_state.generated_article = result
+            article, stage_outputs = generate_with_progress(topic)
+
+            # Store in session state
+            st.session_state.generated_article = article
+            st.session_state.stage_outputs = stage_outputs
 
         except Exception as e:
             st.error(f"Error generating article: {str(e)}")
@@ -66,18 +204,21 @@ def main():
         tab1, tab2 = st.tabs(["📝 Article Preview", "🔍 Structure Details"])
         
         with tab1:
-            st.markdown(st.session_state.generated_article.pydantic.article)
+            st.markdown(st.session_state.generated_article)
             
             # Download button
             st.download_button(
                 label="Download Article (Markdown)",
-                data=st.session_state.generated_article.pydantic.article,
+                data=st.session_state.generated_article,
                 file_name="generated_article.md",
                 mime="text/markdown"
             )
         
         with tab2:
-            st.json(st.session_state.generated_article.pydantic.model_dump())
+            st.json(st.session_state.stage_outputs)
 
 if __name__ == "__main__":
-    main()
+    if st.sidebar.radio("View", ["Generate", "History"]) == "History":
+        history()
+    else:
+        main()